@@ -0,0 +1,218 @@
+"""
+Benchmark of Epson projector transports against the local simulator.
+
+Measures requests per second, p50/p99 latency and memory per projector
+for TCP, HTTP and serial (over a pseudo terminal), for one projector and
+for a fleet of them. Serial fleets get one pseudo terminal per projector.
+HTTP runs both with a session passed by caller and with the pooled session
+Projector shares when none is given. Results are printed as JSON, one
+object per scenario, so they can be compared between releases.
+
+    python -m benchmarks.transport_bench --requests 500 --projectors 100
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import aiohttp
+import asyncio
+
+from epson_projector import Projector, ProjectorFleet
+from epson_projector.const import HTTP, SERIAL, TCP
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.version import __version__
+
+PROPERTIES = ["PWR", "SOURCE", "CMODE", "HDMILINK"]
+SESSION_CALLER = "caller"
+SESSION_POOLED = "pooled"
+
+
+def percentile(values, fraction):
+    """Return percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summary(name, transport, latencies, elapsed, requests, **extra):
+    """Build result record of scenario."""
+    latencies = sorted(latencies)
+    result = {
+        "scenario": name,
+        "transport": transport,
+        "requests": requests,
+        "elapsed": elapsed,
+        "requests_per_second": requests / elapsed if elapsed else None,
+        "latency_p50": percentile(latencies, 0.5),
+        "latency_p99": percentile(latencies, 0.99),
+        "latency_mean": statistics.mean(latencies) if latencies else None,
+    }
+    result.update(extra)
+    return result
+
+
+async def create_projector(simulator, transport, websession):
+    """Create projector connected to simulator."""
+    if transport == SERIAL:
+        return Projector(await simulator.open_pty(), type=SERIAL)
+    port = simulator.tcp_port if transport == TCP else simulator.http_port
+    return Projector(
+        "127.0.0.1",
+        websession=websession,
+        type=transport,
+        port=port,
+        serial_port=simulator.serial_number_port,
+    )
+
+
+async def bench_single(simulator, transport, websession, requests):
+    """Sequential queries and pipelined batches to one projector."""
+    projector = await create_projector(simulator, transport, websession)
+    await projector.get_property("PWR")
+    results = []
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        await projector.get_property("PWR")
+        latencies.append(time.perf_counter() - request_start)
+    results.append(
+        summary(
+            "single_get_property",
+            transport,
+            latencies,
+            time.perf_counter() - start,
+            requests,
+        )
+    )
+    latencies = []
+    batches = max(1, requests // len(PROPERTIES))
+    start = time.perf_counter()
+    for _ in range(batches):
+        request_start = time.perf_counter()
+        await projector.get_properties(PROPERTIES)
+        latencies.append(time.perf_counter() - request_start)
+    results.append(
+        summary(
+            "single_get_properties",
+            transport,
+            latencies,
+            time.perf_counter() - start,
+            batches * len(PROPERTIES),
+            batch_size=len(PROPERTIES),
+        )
+    )
+    projector.close()
+    return results
+
+
+async def bench_fleet(simulator, transport, websession, projectors, sweeps):
+    """Sweeps of many projectors polled through ProjectorFleet."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fleet = ProjectorFleet(
+        [
+            await create_projector(simulator, transport, websession)
+            for _ in range(projectors)
+        ],
+        PROPERTIES,
+        concurrency=projectors,
+        transport_concurrency={transport: projectors},
+    )
+    async for _ in fleet.sweep():
+        pass
+    memory = (tracemalloc.get_traced_memory()[0] - before) / projectors
+    tracemalloc.stop()
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(sweeps):
+        async for result in fleet.sweep():
+            latencies.append(result.latency)
+            errors += result.error is not None
+    elapsed = time.perf_counter() - start
+    fleet.close()
+    return [
+        summary(
+            "fleet_sweep",
+            transport,
+            latencies,
+            elapsed,
+            sweeps * projectors * len(PROPERTIES),
+            projectors=projectors,
+            sweeps=sweeps,
+            sweep_seconds=elapsed / sweeps,
+            errors=errors,
+            memory_per_projector=memory,
+        )
+    ]
+
+
+async def main(args):
+    """Run all scenarios and print results."""
+    results = []
+    async with ProjectorSimulator(latency=args.latency) as simulator:
+        async with aiohttp.ClientSession() as websession:
+            for transport in args.transports:
+                projectors = args.projectors
+                if transport == SERIAL:
+                    projectors = min(projectors, args.serial_projectors)
+                sessions = {SESSION_CALLER: websession}
+                if transport == HTTP:
+                    sessions[SESSION_POOLED] = None
+                for session, session_websession in sessions.items():
+                    scenarios = await bench_single(
+                        simulator, transport, session_websession, args.requests
+                    )
+                    scenarios += await bench_fleet(
+                        simulator,
+                        transport,
+                        session_websession,
+                        projectors,
+                        args.sweeps,
+                    )
+                    if transport == HTTP:
+                        for result in scenarios:
+                            result["session"] = session
+                    results += scenarios
+    meta = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "simulator_latency": args.latency,
+    }
+    output = open(args.output, "w") if args.output else sys.stdout
+    for result in results:
+        result.update(meta)
+        output.write(json.dumps(result) + "\n")
+    if args.output:
+        output.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--projectors", type=int, default=100)
+    parser.add_argument("--sweeps", type=int, default=5)
+    parser.add_argument(
+        "--serial-projectors",
+        type=int,
+        default=16,
+        help="Most projectors in serial fleet, each opens a pseudo terminal",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument(
+        "--transports",
+        nargs="+",
+        default=[TCP, HTTP, SERIAL],
+        choices=[TCP, HTTP, SERIAL],
+    )
+    parser.add_argument("--output", help="File to write JSON lines to")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
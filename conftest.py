@@ -0,0 +1,4 @@
+"""Pytest configuration of Epson projector module."""
+
+# Manual scripts talking to a real projector, run them by hand.
+collect_ignore = ["test_http.py", "test_serial.py", "test_tcp.py"]
@@ -3,5 +3,9 @@
 from epson_projector.error import ProjectorError, ProjectorUnavailableError
 
 from epson_projector.projector import Projector
+from epson_projector.fleet import ProjectorFleet
+from epson_projector.metadata import MetadataStore
+from epson_projector.sync import SyncFleet, SyncProjector
+from epson_projector.state import ColorMode, PowerState, ProjectorState, Source
 
 from epson_projector.version import __version__
@@ -0,0 +1,157 @@
+"""
+Command line tool running queries and commands across many projectors.
+
+Inventory file lists one projector per line as host, optional type
+(tcp, http or serial) and optional port, "#" starts a comment. Results
+are printed as JSON lines while projectors answer.
+
+    python -m epson_projector rooms.txt get PWR SOURCE
+    python -m epson_projector rooms.txt --parallel 128 send "PWR OFF"
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import asyncio
+
+from .const import HTTP, SERIAL, TCP
+from .error import ProjectorError
+from .projector import Projector
+
+DEFAULT_PARALLEL = 64
+DEFAULT_HOST_TIMEOUT = 10
+TRANSPORTS = (TCP, HTTP, SERIAL)
+
+
+def read_inventory(lines, default_type=TCP):
+    """Return list of (host, type, port) from inventory lines."""
+    inventory = []
+    for number, line in enumerate(lines, 1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        if len(fields) > 3 or len(fields) > 1 and fields[1] not in TRANSPORTS:
+            raise ValueError(f"Invalid inventory line {number}: {line.strip()}")
+        port = int(fields[2]) if len(fields) > 2 else None
+        inventory.append(
+            (fields[0], fields[1] if len(fields) > 1 else default_type, port)
+        )
+    return inventory
+
+
+async def _get(projector, args):
+    values = await projector.get_properties(args.properties)
+    if not any(value is not False for value in values.values()):
+        raise ProjectorError(message="no answer")
+    return values
+
+
+async def _send(projector, args):
+    response = await projector.send_command(args.command)
+    if response is False or response is None:
+        raise ProjectorError(message=f"{args.command} rejected")
+    return args.command
+
+
+async def _state(projector, args):
+    state = (await projector.get_state()).as_dict()
+    if not any(value is not None for value in state.values()):
+        raise ProjectorError(message="no answer")
+    return state
+
+
+async def _serial(projector, args):
+    return await projector.get_serial_number()
+
+
+async def run_host(host, transport, port, args):
+    """Run operation on one projector, return result record."""
+    start = time.monotonic()
+    record = {"host": host, "type": transport}
+    projector = Projector(host, type=transport, port=port)
+    try:
+        record["result"] = await asyncio.wait_for(
+            args.operation(projector, args), args.timeout
+        )
+    except asyncio.TimeoutError:
+        record["error"] = "timeout"
+    except (ProjectorError, OSError) as err:
+        record["error"] = str(err) or type(err).__name__
+    finally:
+        projector.close()
+    record["latency"] = time.monotonic() - start
+    return record
+
+
+async def run(args, output=sys.stdout):
+    """Run operation on all projectors of inventory, return number of failures."""
+    with open(args.inventory) if args.inventory != "-" else sys.stdin as fh:
+        inventory = read_inventory(fh, args.type)
+    semaphore = asyncio.Semaphore(args.parallel)
+
+    async def limited(host, transport, port):
+        async with semaphore:
+            return await run_host(host, transport, port, args)
+
+    failures = 0
+    for done in asyncio.as_completed(
+        [limited(host, transport, port) for host, transport, port in inventory]
+    ):
+        record = await done
+        failures += "error" in record
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m epson_projector", description=__doc__.splitlines()[1]
+    )
+    parser.add_argument("inventory", help="Inventory file, - for standard input")
+    parser.add_argument(
+        "--type", default=TCP, choices=TRANSPORTS, help="Default connection type"
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_PARALLEL,
+        help="Projectors handled at the same time",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_HOST_TIMEOUT,
+        help="Seconds for one projector",
+    )
+    parser.add_argument("--debug", action="store_true")
+    operations = parser.add_subparsers(dest="operation_name", required=True)
+    get = operations.add_parser("get", help="Query properties")
+    get.add_argument("properties", nargs="+")
+    get.set_defaults(operation=_get)
+    send = operations.add_parser("send", help="Send command")
+    send.add_argument("command")
+    send.set_defaults(operation=_send)
+    operations.add_parser("state", help="Get decoded state").set_defaults(
+        operation=_state
+    )
+    operations.add_parser("serial", help="Get serial number").set_defaults(
+        operation=_serial
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.CRITICAL)
+    try:
+        return 1 if asyncio.run(run(args)) else 0
+    except (OSError, ValueError) as err:
+        print(err, file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Cache of property values read from Epson projector."""
+import time
+
+import asyncio
+
+from .commands import get_command
+from .const import ALL, BUSY, STATE_UNAVAILABLE
+
+
+def _is_cacheable(value):
+    """Only real replies are cached, not errors or busy responses."""
+    return value not in (False, None, BUSY, STATE_UNAVAILABLE)
+
+
+class PropertyCache:
+    """
+    Property cache with time to live per command.
+
+    Concurrent reads of the same property share one request to projector.
+    Values read while an invalidation happened are not stored, as they may
+    be older than the command that caused it.
+    """
+
+    def __init__(self, ttl):
+        """
+        Init cache.
+
+        :param ttl:     Seconds to keep values, or dict of command to seconds
+                        with optional ALL key as default for other commands
+        """
+        if isinstance(ttl, dict):
+            self._ttl = dict(ttl)
+            self._default_ttl = self._ttl.pop(ALL, 0)
+        else:
+            self._ttl = {}
+            self._default_ttl = ttl
+        self._values = {}
+        self._inflight = {}
+        self.generation = 0
+
+    def ttl(self, command):
+        """Return time to live of command value."""
+        return self._ttl.get(command, self._default_ttl)
+
+    def peek(self, command):
+        """Return cached value of command or None if missing or expired."""
+        entry = self._values.get(command)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def store(self, command, value, generation):
+        """Store value read when cache was at generation."""
+        if generation == self.generation and _is_cacheable(value):
+            ttl = self.ttl(command)
+            if ttl:
+                self._values[command] = (value, time.monotonic() + ttl)
+
+    async def get(self, command, fetch):
+        """Return cached value or share single request made with fetch."""
+        value = self.peek(command)
+        if value is not None:
+            return value
+        future = self._inflight.get(command)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(command, fetch))
+            self._inflight[command] = future
+        return await asyncio.shield(future)
+
+    async def _fetch(self, command, fetch):
+        generation = self.generation
+        try:
+            value = await fetch()
+            self.store(command, value, generation)
+            return value
+        finally:
+            del self._inflight[command]
+
+    def invalidate(self, properties=(ALL,)):
+        """Drop cached values of properties, ALL drops everything."""
+        self.generation += 1
+        if ALL in properties:
+            self._values.clear()
+            return
+        for name in properties:
+            self._values.pop(name, None)
+
+    def invalidate_command(self, command):
+        """Drop cached values of properties changed by command."""
+        properties = get_command(command).touches
+        if properties:
+            self.invalidate(properties)
@@ -0,0 +1,202 @@
+"""
+Registry of commands of Epson projector.
+
+Every entry of EPSON_KEY_COMMANDS is compiled once at import into an
+immutable Command holding everything connections need to send it.
+Other names, like "LAMP" or "KEY 3B", are raw ESC/VP21 and compiled on
+first use.
+"""
+from .const import (
+    ALL,
+    CR,
+    DEFAULT_TIMEOUT_TIME,
+    DIRECT_SEND,
+    EPSON_KEY_COMMANDS,
+    GET_CR,
+    INV_SOURCES,
+    JSON_QUERY,
+    LUMINANCE,
+    MUTE,
+    POWER,
+    POWER_SAFE_QUERIES,
+    PWR_OFF_STATE,
+    SOURCE,
+    SOURCE_LIST,
+    TIMEOUT_TIMES,
+    TURN_OFF,
+    TURN_ON,
+    VOL_DOWN,
+    VOL_UP,
+    VOLUME,
+)
+from .framer import parse_frame
+from .state import Source
+
+JSON_CALLBACK = "jsoncallback"
+KEY = "KEY"
+
+# Parameters of commands, which change more than their own property.
+_CHANGE_EVERYTHING = ("POPMEM",)
+_KEY_COMMAND_PROPERTIES = {
+    VOL_UP: (VOLUME, "VOL"),
+    VOL_DOWN: (VOLUME, "VOL"),
+    MUTE: (MUTE,),
+}
+# ESC/VP21 properties queried under another name over HTTP.
+_PROPERTY_ALIASES = {"VOL": VOLUME}
+# Power states reached by power commands.
+POWER_TARGET_STATES = {TURN_ON: ("01",), TURN_OFF: ("00", PWR_OFF_STATE)}
+# Properties set by absolute value or stepped with keys: ESC/VP21 name,
+# key increasing and key decreasing the value.
+STEPPED_PROPERTIES = {VOLUME: ("VOL", VOL_UP, VOL_DOWN)}
+
+
+def _lock_category(name, touches):
+    """Return operation projector is busy with after command."""
+    if name in (TURN_ON, TURN_OFF) or not touches:
+        return name
+    if ALL in touches:
+        return ALL
+    return touches[0]
+
+
+def _touched_properties(name, params):
+    """Return properties changed by command, ALL when it can change any."""
+    if name in (TURN_ON, TURN_OFF):
+        return (ALL,)
+    if name in INV_SOURCES:
+        return (SOURCE,)
+    if name in _KEY_COMMAND_PROPERTIES:
+        return _KEY_COMMAND_PROPERTIES[name]
+    properties = []
+    for key, _ in params:
+        if key in _CHANGE_EVERYTHING or key == KEY and name not in EPSON_KEY_COMMANDS:
+            return (ALL,)
+        if key not in (KEY, JSON_CALLBACK):
+            properties.append(key)
+            if key in _PROPERTY_ALIASES:
+                properties.append(_PROPERTY_ALIASES[key])
+    return tuple(properties)
+
+
+class Command:
+    """
+    Compiled command.
+
+    :ivar str name:             Name used by callers, like "CMODE_CINEMA"
+    :ivar str escvp:            ESC/VP21 name of property for queries
+    :ivar bool is_query:        True if command reads a property
+    :ivar bytes get_frame:      Encoded ESC/VP21 query
+    :ivar bytes set_frame:      Encoded ESC/VP21 command
+    :ivar bytes reply_key:      Prefix of ESC/VP21 reply to query
+    :ivar tuple http_params:    Query parameters of HTTP request
+    :ivar str http_type:        CGI endpoint of HTTP request
+    :ivar float timeout:        Timeout of request in seconds
+    :ivar str lock_category:    Operation projector is busy with after command
+    :ivar tuple touches:        Properties changed by command, ALL for any
+    :ivar frozenset scope:      Properties read or changed, checked against locks
+    :ivar bool power_safe:      True if query is answered during power transitions
+    """
+
+    __slots__ = (
+        "name",
+        "escvp",
+        "is_query",
+        "get_frame",
+        "set_frame",
+        "reply_key",
+        "http_params",
+        "http_type",
+        "timeout",
+        "lock_category",
+        "touches",
+        "scope",
+        "power_safe",
+    )
+
+    def __init__(self, name, params=None):
+        """Compile command from name and its EPSON_KEY_COMMANDS parameters."""
+        if params is None:
+            params = _raw_params(name)
+            wire = name
+        elif len(params) == 1 and params[0][0] != JSON_CALLBACK and " " not in name:
+            wire = f"{params[0][0]} {params[0][1]}"
+        else:
+            wire = name
+        is_query = params[0][0] == JSON_CALLBACK
+        escvp = params[0][1][:-1] if is_query else name
+        setattr_ = super().__setattr__
+        setattr_("name", name)
+        setattr_("escvp", escvp)
+        setattr_("is_query", is_query)
+        setattr_("get_frame", (escvp + GET_CR).encode())
+        setattr_("set_frame", (wire + CR).encode())
+        setattr_("reply_key", f"{escvp}=".encode())
+        setattr_("http_params", tuple(params))
+        setattr_("http_type", JSON_QUERY if is_query else DIRECT_SEND)
+        setattr_("timeout", TIMEOUT_TIMES.get(name, DEFAULT_TIMEOUT_TIME))
+        touches = () if is_query else _touched_properties(name, params)
+        setattr_("lock_category", _lock_category(name, touches))
+        setattr_("touches", touches)
+        setattr_("scope", frozenset((name, escvp) if is_query else touches))
+        setattr_("power_safe", is_query and escvp in POWER_SAFE_QUERIES)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Command is immutable")
+
+    def __repr__(self):
+        return f"Command({self.name!r})"
+
+    def decode(self, frame):
+        """Return value of ESC/VP21 reply frame, ERROR if query was rejected."""
+        return parse_frame(frame, self.reply_key)
+
+
+def _raw_params(name):
+    """Return HTTP parameters of raw ESC/VP21 name like "LAMP" or "KEY 3B"."""
+    key, _, value = name.partition(" ")
+    if value:
+        return ((key, value),)
+    return ((JSON_CALLBACK, name + "?"),)
+
+
+COMMANDS = {name: Command(name, params) for name, params in EPSON_KEY_COMMANDS.items()}
+
+# Queries probed by capability discovery, table ones and properties which
+# table commands set without having own query entry.
+CAPABILITY_QUERIES = tuple(
+    name for name, command in COMMANDS.items() if command.is_query
+) + (LUMINANCE, "IMGPROC")
+
+
+def get_command(name):
+    """Return compiled command, raw ESC/VP21 names are compiled on first use."""
+    command = COMMANDS.get(name)
+    if command is None:
+        command = COMMANDS[name] = Command(name)
+    return command
+
+
+def command_target(name):
+    """
+    Return (property, accepted values) command brings projector to.
+
+    None is returned for commands without readable result, like memory
+    recalls or key presses.
+    """
+    if name in POWER_TARGET_STATES:
+        return (POWER, POWER_TARGET_STATES[name])
+    source = Source.from_name(name)
+    if source is not None and source.command == name:
+        codes = {source.code, *SOURCE_LIST}
+        return (
+            SOURCE,
+            tuple(sorted(code for code in codes if Source.from_code(code) is source)),
+        )
+    params = EPSON_KEY_COMMANDS.get(name)
+    if params is None or len(params) != 1:
+        return None
+    prop, value = params[0]
+    if get_command(name).touches == (prop,) and prop in CAPABILITY_QUERIES:
+        return (prop, (value,))
+    return None
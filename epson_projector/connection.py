@@ -0,0 +1,186 @@
+"""Persistent ESC/VP.net connection of Epson projector module."""
+
+import logging
+import random
+import socket
+
+import asyncio
+import async_timeout
+
+from .const import ESCVP_HELLO_COMMAND, ESCVPNET_HELLO_COMMAND, ESCVPNETNAME
+from .framer import ResponseFramer
+
+_LOGGER = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 10
+HELLO_RESPONSE_LENGTH = 16
+HELLO_STATUS_OK = 32
+KEEPALIVE_INTERVAL = 30
+KEEPALIVE_TIMEOUT = 5
+BACKOFF_BASE = 1
+BACKOFF_MAX = 60
+
+
+def backoff_delay(attempt):
+    """Return jittered exponential delay before reconnect attempt."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt) * random.uniform(0.5, 1)
+
+
+class TcpConnection:
+    """
+    Connection manager of ESC/VP.net socket.
+
+    Connection is opened with the ESC/VP.net handshake in the background
+    as soon as the manager is started. Idle connection is checked with
+    empty ESC/VP21 requests, which projector answers with colon prompt
+    only, and is reopened with jittered exponential backoff when lost.
+    """
+
+    def __init__(self, host, port):
+        """
+        Init connection manager.
+
+        :param str host:    IP address of Projector
+        :param int port:    ESC/VP.net port
+        """
+        self._host = host
+        self._port = port
+        self._loop = asyncio.get_running_loop()
+        self.reader = None
+        self.writer = None
+        self.framer = ResponseFramer()
+        self.lock = asyncio.Lock()
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._last_activity = 0
+        self._task = None
+
+    @property
+    def connected(self):
+        """Return True if connection is open and handshake passed."""
+        return self._connected.is_set()
+
+    def start(self):
+        """Start connecting in the background."""
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+
+    def close(self):
+        """Stop connection manager and close connection."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._drop()
+
+    async def wait_connected(self, timeout):
+        """Wait until connection is open, return False on timeout."""
+        if self.connected and self.reader.at_eof():
+            self.connection_lost("connection closed by projector")
+        if self._task is None:
+            self.start()
+        try:
+            async with async_timeout.timeout(timeout):
+                await self._connected.wait()
+        except asyncio.TimeoutError:
+            _LOGGER.error("Projector %s is not connected", self._host)
+            return False
+        return True
+
+    def touch(self):
+        """Mark successful exchange so keepalive probe is not needed."""
+        self._last_activity = self._loop.time()
+
+    def connection_lost(self, reason):
+        """Mark connection as lost so it is reopened in the background."""
+        if self.connected:
+            _LOGGER.warning("Connection to %s lost: %s", self._host, reason)
+            self._drop()
+            self._lost.set()
+
+    async def _run(self):
+        """Keep connection open for the lifetime of the manager."""
+        attempt = 0
+        while True:
+            if await self._open():
+                attempt = 0
+                await self._keepalive()
+                self._drop()
+                continue
+            delay = backoff_delay(attempt)
+            attempt += 1
+            _LOGGER.debug("Reconnecting to %s in %.1f s", self._host, delay)
+            await asyncio.sleep(delay)
+
+    async def _open(self):
+        """Open connection and do ESC/VP.net handshake."""
+        try:
+            async with async_timeout.timeout(CONNECT_TIMEOUT):
+                self.reader, self.writer = await asyncio.open_connection(
+                    host=self._host, port=self._port
+                )
+                sock = self.writer.get_extra_info("socket")
+                if sock is not None:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                self.writer.write(ESCVPNET_HELLO_COMMAND.encode())
+                response = await self.reader.readexactly(HELLO_RESPONSE_LENGTH)
+                if (
+                    response[0:10].decode() == ESCVPNETNAME
+                    and response[14] == HELLO_STATUS_OK
+                ):
+                    self.framer.reset()
+                    self._lost.clear()
+                    self.touch()
+                    self._connected.set()
+                    _LOGGER.info("Connection open")
+                    return True
+                _LOGGER.info("Cannot open connection to Epson")
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout error")
+        except asyncio.IncompleteReadError:
+            _LOGGER.error("Connection closed during handshake")
+        except ConnectionRefusedError:
+            _LOGGER.error("Connection refused Error")
+        except OSError as err:
+            _LOGGER.error("No route to host? %s", err)
+        self._drop()
+        return False
+
+    async def _keepalive(self):
+        """Probe idle connection until it is lost."""
+        while True:
+            try:
+                async with async_timeout.timeout(KEEPALIVE_INTERVAL):
+                    await self._lost.wait()
+                return
+            except asyncio.TimeoutError:
+                pass
+            if self._loop.time() - self._last_activity < KEEPALIVE_INTERVAL:
+                continue
+            if not await self._probe():
+                return
+
+    async def _probe(self):
+        """Send empty request and wait for the prompt."""
+        async with self.lock:
+            if not self.connected:
+                return False
+            try:
+                async with async_timeout.timeout(KEEPALIVE_TIMEOUT):
+                    self.writer.write(ESCVP_HELLO_COMMAND.encode())
+                    await self.framer.read_response(self.reader, None)
+            except asyncio.TimeoutError:
+                self.connection_lost("no answer to keepalive")
+                return False
+            except OSError as err:
+                self.connection_lost(err)
+                return False
+        self.touch()
+        return True
+
+    def _drop(self):
+        """Close socket and mark connection as closed."""
+        self._connected.clear()
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
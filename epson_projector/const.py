@@ -3,6 +3,7 @@
 HTTP = "http"
 TCP = "tcp"
 SERIAL = "serial"
+REPLAY = "replay"
 HTTP_OK = 200
 
 TCP_PORT = 3629
@@ -21,7 +22,10 @@ ESCVPNET_HELLO_COMMAND = "ESC/VP.net\x10\x03\x00\x00\x00\x00"
 ESCVPNETNAME = "ESC/VP.net"
 ESCVPNAME = "ESC/VP"
 ERROR = "ERR"
+PWR_STANDBY_STATE = "00"
 PWR_OFF_STATE = "04"
+PWR_WARMUP_STATE = "02"
+PWR_COOLDOWN_STATE = "03"
 ESCVP_HELLO_COMMAND = "\r"
 COLON = ":"
 CR = "\r"
@@ -63,6 +67,9 @@ BUSY_CODES = [2, "2", "02"]
 
 EPSON_CODES = {"PWR": "01"}
 
+# Queries projectors answer while warming up or cooling down.
+POWER_SAFE_QUERIES = ["PWR", "SNO", "LAMP"]
+
 EPSON_KEY_COMMANDS = {
     "PWR ON": [("KEY", "3B")],
     "PWR OFF": [("KEY", "3B"), ("KEY", "3B")],
@@ -0,0 +1,141 @@
+"""Discovery of ESC/VP.net projectors in a network."""
+import ipaddress
+import logging
+from collections import namedtuple
+
+import asyncio
+import async_timeout
+
+from .commands import get_command
+from .connection import HELLO_RESPONSE_LENGTH, HELLO_STATUS_OK
+from .const import ERROR, ESCVPNET_HELLO_COMMAND, ESCVPNETNAME, SNO, TCP, TCP_PORT
+from .framer import ResponseFramer
+
+_LOGGER = logging.getLogger(__name__)
+
+DISCOVERY_CONCURRENCY = 256
+DISCOVERY_TIMEOUT = 0.5
+
+DiscoveredProjector = namedtuple("DiscoveredProjector", ["host", "transport", "serial"])
+DiscoveredProjector.__doc__ = (
+    "Projector answering ESC/VP.net, serial is None if unknown."
+)
+
+
+def _is_hello_response(data):
+    """Return True if data is ESC/VP.net hello answer with OK status."""
+    return (
+        len(data) >= HELLO_RESPONSE_LENGTH
+        and data[: len(ESCVPNETNAME)] == ESCVPNETNAME.encode()
+        and data[14] == HELLO_STATUS_OK
+    )
+
+
+class _HelloProtocol(asyncio.DatagramProtocol):
+    """Collect addresses answering ESC/VP.net hello datagram."""
+
+    def __init__(self):
+        self.responders = set()
+
+    def datagram_received(self, data, addr):
+        if _is_hello_response(data):
+            self.responders.add(addr[0])
+
+    def error_received(self, exc):
+        _LOGGER.debug("Discovery datagram error: %s", exc)
+
+
+async def _probe_tcp(host, port, timeout):
+    """
+    Do ESC/VP.net handshake with host and ask for serial number.
+
+    Returns DiscoveredProjector, None if host does not answer.
+    """
+    writer = None
+    try:
+        async with async_timeout.timeout(timeout):
+            reader, writer = await asyncio.open_connection(host=host, port=port)
+            writer.write(ESCVPNET_HELLO_COMMAND.encode())
+            if not _is_hello_response(await reader.readexactly(HELLO_RESPONSE_LENGTH)):
+                return None
+        serial = None
+        command = get_command(SNO)
+        try:
+            async with async_timeout.timeout(timeout):
+                writer.write(command.get_frame)
+                frame = await ResponseFramer().read_response(reader, command.reply_key)
+                serial = command.decode(frame)
+        except asyncio.TimeoutError:
+            pass
+        if serial in (ERROR, False):
+            serial = None
+        return DiscoveredProjector(host, TCP, serial)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _broadcast_hello(network, port):
+    """Send ESC/VP.net hello datagram to broadcast address of network."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        _HelloProtocol, local_addr=("0.0.0.0", 0), allow_broadcast=True
+    )
+    try:
+        transport.sendto(
+            ESCVPNET_HELLO_COMMAND.encode(), (str(network.broadcast_address), port)
+        )
+    except OSError as err:
+        _LOGGER.warning("Cannot send discovery broadcast: %s", err)
+    return transport, protocol
+
+
+async def discover(
+    network,
+    port=TCP_PORT,
+    udp_port=TCP_PORT,
+    concurrency=DISCOVERY_CONCURRENCY,
+    timeout=DISCOVERY_TIMEOUT,
+):
+    """
+    Find projectors in network.
+
+    Every host of the network is probed with ESC/VP.net handshake, at most
+    concurrency of them at a time, and asked for its serial number.
+    Meanwhile hello datagram is broadcast, projectors answering only that
+    are returned without serial number.
+
+    :param network:             CIDR range like "192.168.1.0/22"
+    :param int port:            ESC/VP.net TCP port
+    :param int udp_port:        Port of discovery broadcast, None to skip it
+    :param int concurrency:     Maximum number of connections at once
+    :param float timeout:       Seconds to wait for connection and answers
+    """
+    network = ipaddress.ip_network(network, strict=False)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host):
+        async with semaphore:
+            return await _probe_tcp(str(host), port, timeout)
+
+    udp = None
+    if udp_port is not None:
+        udp = await _broadcast_hello(network, udp_port)
+    start = asyncio.get_running_loop().time()
+    found = {
+        result.host: result
+        for result in await asyncio.gather(*(probe(host) for host in network.hosts()))
+        if result is not None
+    }
+    if udp is not None:
+        transport, protocol = udp
+        await asyncio.sleep(
+            max(0, timeout - (asyncio.get_running_loop().time() - start))
+        )
+        transport.close()
+        for host in protocol.responders:
+            if host not in found and ipaddress.ip_address(host) in network:
+                found[host] = DiscoveredProjector(host, TCP, None)
+    return sorted(found.values(), key=lambda result: ipaddress.ip_address(result.host))
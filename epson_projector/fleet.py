@@ -0,0 +1,173 @@
+"""Polling of many Epson projectors at once."""
+
+import logging
+import random
+import time
+from collections import namedtuple
+
+import asyncio
+
+from .const import HTTP, SERIAL, TCP
+from .error import ProjectorError
+from .projector import Projector
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5
+DEFAULT_CONCURRENCY = 64
+DEFAULT_TRANSPORT_CONCURRENCY = {HTTP: 16, TCP: 64, SERIAL: 8}
+DEFAULT_JITTER = 0.1
+
+FleetResult = namedtuple(
+    "FleetResult", ["host", "values", "error", "latency", "timestamp"]
+)
+FleetResult.__doc__ = "Properties polled from one projector, error is None on success."
+
+
+class ProjectorFleet:
+    """
+    Fleet of Epson projectors polled together.
+
+    Number of projectors polled at the same time is limited globally and per
+    type of connection. Every projector is polled on its own jittered
+    schedule, so polls of the fleet do not happen in bursts.
+    """
+
+    def __init__(
+        self,
+        projectors,
+        properties,
+        interval=DEFAULT_INTERVAL,
+        concurrency=DEFAULT_CONCURRENCY,
+        transport_concurrency=None,
+        jitter=DEFAULT_JITTER,
+        timeout=None,
+    ):
+        """
+        Init fleet.
+
+        :param projectors:              Iterable of Projector objects
+        :param list properties:         Properties to poll from every projector
+        :param float interval:          Seconds between polls of a projector
+        :param int concurrency:         Maximum number of polls in progress
+        :param dict transport_concurrency: Maximum polls in progress per type
+        :param float jitter:            Fraction of interval to randomize by
+        :param float timeout:           Seconds to wait for one poll, None to wait
+                                        as long as projector needs
+        """
+        self._projectors = list(projectors)
+        self._properties = list(properties)
+        self._interval = interval
+        self._jitter = jitter
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        limits = dict(DEFAULT_TRANSPORT_CONCURRENCY)
+        limits.update(transport_concurrency or {})
+        self._transport_semaphores = {
+            transport: asyncio.Semaphore(limit) for transport, limit in limits.items()
+        }
+
+    @classmethod
+    def from_hosts(cls, hosts, properties, websession=None, **kwargs):
+        """
+        Create fleet from (host, type) pairs.
+
+        Must be called from running event loop, as TCP and serial
+        connections are opened right away.
+        """
+        projectors = [
+            Projector(host=host, websession=websession, type=transport)
+            for host, transport in hosts
+        ]
+        return cls(projectors, properties, **kwargs)
+
+    @property
+    def projectors(self):
+        """Return projectors of fleet."""
+        return self._projectors
+
+    def close(self):
+        """Close connections to all projectors."""
+        for projector in self._projectors:
+            projector.close()
+
+    async def sweep(self):
+        """Poll every projector once, yield results as they complete."""
+        queue = asyncio.Queue()
+        tasks = [
+            asyncio.ensure_future(self._poll_into(projector, queue))
+            for projector in self._projectors
+        ]
+        try:
+            for _ in tasks:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self):
+        """Poll projectors continuously, yield results as they complete."""
+        queue = asyncio.Queue()
+        tasks = [
+            asyncio.ensure_future(self._poll_loop(projector, queue))
+            for projector in self._projectors
+        ]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _poll_loop(self, projector, queue):
+        """Poll one projector on its own jittered schedule."""
+        await asyncio.sleep(random.uniform(0, self._interval))
+        while True:
+            start = time.monotonic()
+            await self._poll_into(projector, queue)
+            delay = self._interval * random.uniform(1 - self._jitter, 1 + self._jitter)
+            await asyncio.sleep(max(0, delay - (time.monotonic() - start)))
+
+    async def _poll_into(self, projector, queue):
+        start = time.monotonic()
+        try:
+            result = await self.poll(projector)
+        except Exception as err:  # pylint: disable=broad-except
+            # Every projector must yield a result, or sweep waits forever.
+            _LOGGER.exception("Unexpected error polling %s", projector.host)
+            result = FleetResult(
+                host=projector.host,
+                values={},
+                error=type(err).__name__,
+                latency=time.monotonic() - start,
+                timestamp=time.time(),
+            )
+        queue.put_nowait(result)
+
+    async def poll(self, projector):
+        """Poll properties of one projector within concurrency limits."""
+        transport_semaphore = self._transport_semaphores.get(projector.type)
+        if transport_semaphore is None:
+            transport_semaphore = self._transport_semaphores[projector.type] = (
+                asyncio.Semaphore(DEFAULT_CONCURRENCY)
+            )
+        async with transport_semaphore, self._semaphore:
+            start = time.monotonic()
+            values = {}
+            error = None
+            try:
+                values = await asyncio.wait_for(
+                    projector.get_properties(self._properties), self._timeout
+                )
+            except asyncio.TimeoutError:
+                error = "timeout"
+            except (ProjectorError, OSError) as err:
+                _LOGGER.debug("Polling %s failed: %r", projector.host, err)
+                error = type(err).__name__
+            return FleetResult(
+                host=projector.host,
+                values=values,
+                error=error,
+                latency=time.monotonic() - start,
+                timestamp=time.time(),
+            )
@@ -0,0 +1,104 @@
+"""Streaming framer of ESC/VP21 responses shared by TCP and serial connections."""
+from .const import COLON, CR, ERROR, GET_CR
+
+PROMPT = COLON.encode()
+ERROR_BYTES = ERROR.encode()
+_CR = CR.encode()
+_GET_CR = GET_CR.encode()
+READ_SIZE = 256
+
+
+class ResponseFramer:
+    """
+    Incremental framer of ESC/VP21 byte stream.
+
+    Every answer of the projector ends with the colon prompt. Received
+    bytes are buffered and cut into frames on the prompt without decoding
+    the buffer. After a timeout replies of abandoned requests may still
+    arrive, so their number is remembered and exactly that many frames
+    are skipped instead of being returned as answers to next requests.
+    """
+
+    __slots__ = ("_buffer", "_stale")
+
+    def __init__(self):
+        """Init empty framer."""
+        self._buffer = bytearray()
+        self._stale = 0
+
+    def feed(self, data):
+        """Add received bytes to the buffer."""
+        self._buffer += data
+
+    def next_frame(self):
+        """Return next complete frame without CR and prompt, None if incomplete."""
+        index = self._buffer.find(PROMPT)
+        if index == -1:
+            return None
+        frame = bytes(self._buffer[:index]).strip(_CR)
+        del self._buffer[: index + 1]
+        return frame
+
+    def resync(self, pending=1):
+        """
+        Skip replies of pending requests, written but abandoned unanswered.
+
+        Projector answers every request with exactly one frame, so the next
+        pending frames are dropped whatever they contain, including partial
+        data already buffered, which is the start of the first of them.
+        """
+        self._stale += pending
+
+    def reset(self):
+        """Reset framer state, used when connection is (re)opened."""
+        self._buffer.clear()
+        self._stale = 0
+
+    def accept(self, frame, key):
+        """
+        Check if frame answers current request.
+
+        :param bytes frame: Frame returned by next_frame
+        :param bytes key:   Expected reply prefix like b"PWR=" or None for commands
+        """
+        if self._stale:
+            self._stale -= 1
+            return False
+        if key is not None and key in frame:
+            return True
+        if frame == ERROR_BYTES:
+            return True
+        if key is None:
+            return b"=" not in frame
+        return False
+
+    async def read_response(self, reader, key):
+        """Read from stream until frame answering current request arrives."""
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    raise ConnectionResetError("Connection closed by projector")
+                self.feed(data)
+            elif self.accept(frame, key):
+                return frame
+
+
+def request_key(command):
+    """Return reply prefix expected for encoded request, None for commands."""
+    if command.endswith(_GET_CR):
+        return command[: -len(_GET_CR)] + b"="
+    return None
+
+
+def parse_frame(frame, key):
+    """Return value of reply frame, ERROR for ERR reply."""
+    if frame == ERROR_BYTES:
+        return ERROR
+    if key is None:
+        return frame.decode()
+    index = frame.find(key)
+    if index == -1:
+        return False
+    return frame[index + len(key) :].decode()
@@ -0,0 +1,284 @@
+"""
+ESC/VP.net gateway sharing one projector connection between many clients.
+
+Projectors accept one ESC/VP.net connection at a time. The gateway keeps
+that connection, through Projector over TCP, and accepts any number of
+ESC/VP.net clients on a local port per projector, and JSON lines clients
+on one port for all projectors.
+
+    python -m epson_projector.gateway 192.168.1.10=13629 --json-port 8765
+"""
+import argparse
+import json
+import logging
+import re
+
+import asyncio
+
+from .commands import CAPABILITY_QUERIES, KEY, STEPPED_PROPERTIES, get_command
+from .const import (
+    CR,
+    EPSON_KEY_COMMANDS,
+    ERROR,
+    ESCVPNET_HELLO_COMMAND,
+    POWER_SAFE_QUERIES,
+    TCP,
+    TCP_PORT,
+)
+from .error import ProjectorError
+from .projector import Projector
+from .scheduler import PRIORITY_COMMAND
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL = 1
+HELLO_RESPONSE = (ESCVPNET_HELLO_COMMAND[:14] + "\x20\x00").encode()
+PROMPT = b":"
+MAX_STEPPED_VALUE = 255
+
+
+def _requests():
+    """Return ESC/VP21 queries and commands of registry, keyed by wire form."""
+    queries = {name: name for name in (*POWER_SAFE_QUERIES, *CAPABILITY_QUERIES)}
+    commands = {}
+    for name, params in EPSON_KEY_COMMANDS.items():
+        command = get_command(name)
+        if command.is_query:
+            queries[name] = name
+            queries.setdefault(command.escvp, name)
+            continue
+        commands.setdefault(command.set_frame[:-1].decode(), name)
+        commands[name] = name
+        for key, _ in params:
+            if key != KEY:
+                queries.setdefault(key, key)
+    return queries, commands
+
+
+# Clients may only use known queries and commands, or set properties and
+# press keys with two digit codes, as Projector compiles and tracks every
+# request name for good.
+_QUERIES, _COMMANDS = _requests()
+_STEPPED = {escvp for escvp, _, _ in STEPPED_PROPERTIES.values()}
+_CODE = re.compile("[0-9A-Fa-f]{2}")
+
+
+def resolve_query(name):
+    """Return registry name of property client asks for, None if unknown."""
+    return _QUERIES.get(name)
+
+
+def resolve_command(request):
+    """Return registry name of command client sends, None if unknown."""
+    if request in _COMMANDS:
+        return _COMMANDS[request]
+    name, _, value = request.partition(" ")
+    if name in _STEPPED and value.isdigit() and int(value) <= MAX_STEPPED_VALUE:
+        return f"{name} {int(value)}"
+    if (name == KEY or name in _QUERIES) and _CODE.fullmatch(value):
+        return f"{name} {value.upper()}"
+    return None
+
+
+class ProjectorGateway:
+    """
+    Gateway multiplexing clients onto one connection per projector.
+
+    Queries are answered from a cache for cache_ttl seconds, so clients
+    polling the same properties cost one request to projector. Each client
+    has at most one request in flight and requests are served in arrival
+    order, so a busy client cannot starve the others.
+    """
+
+    def __init__(self, cache_ttl=DEFAULT_CACHE_TTL):
+        """
+        Init gateway without projectors.
+
+        :param cache_ttl:   Seconds to answer repeated queries from cache,
+                            or dict of command to seconds, see Projector
+        """
+        self._cache_ttl = cache_ttl
+        self._projectors = {}
+        self._servers = []
+        self._clients = {}
+
+    @property
+    def projectors(self):
+        """Return dict of host to Projector."""
+        return dict(self._projectors)
+
+    async def add_projector(
+        self, host, listen_port=0, port=TCP_PORT, listen_host="127.0.0.1"
+    ):
+        """
+        Connect to projector and serve ESC/VP.net clients for it.
+
+        Returns port clients connect to, 0 picks a free one.
+        """
+        projector = Projector(host, type=TCP, port=port, cache_ttl=self._cache_ttl)
+        self._projectors[host] = projector
+        server = await asyncio.start_server(
+            lambda reader, writer: self._handle_escvpnet(projector, reader, writer),
+            listen_host,
+            listen_port,
+        )
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def start_json(self, listen_port=0, listen_host="127.0.0.1"):
+        """
+        Serve JSON lines clients for all projectors, return port.
+
+        Requests are objects with host and either get with list of
+        properties or send with command, like {"host": "10.0.0.5", "get":
+        ["PWR"]}. Every request is answered with one line, with values of
+        properties or command, or with error.
+        """
+        server = await asyncio.start_server(self._handle_json, listen_host, listen_port)
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop serving, disconnect clients and close projector connections."""
+        for server in self._servers:
+            server.close()
+        for task, writer in self._clients.items():
+            writer.close()
+            task.cancel()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+        for projector in self._projectors.values():
+            projector.close()
+        self._projectors = {}
+
+    async def handle_request(self, projector, request):
+        """Answer one ESC/VP21 request without CR, return reply without prompt."""
+        if not request:
+            return ""
+        if request.endswith("?"):
+            name = resolve_query(request[:-1])
+            if name is None:
+                return ERROR
+            value = await projector.get_property(name, priority=PRIORITY_COMMAND)
+            return ERROR if value is False else f"{request[:-1]}={value}"
+        command = resolve_command(request)
+        if command is None:
+            return ERROR
+        response = await projector.send_command(command)
+        return ERROR if response is False else ""
+
+    async def _handle_escvpnet(self, projector, reader, writer):
+        self._clients[asyncio.current_task()] = writer
+        try:
+            hello = await reader.readexactly(len(ESCVPNET_HELLO_COMMAND))
+            if hello[:10] != ESCVPNET_HELLO_COMMAND[:10].encode():
+                return
+            writer.write(HELLO_RESPONSE)
+            while True:
+                request = (await reader.readuntil(CR.encode()))[:-1].decode()
+                try:
+                    reply = await self.handle_request(projector, request)
+                except (ProjectorError, asyncio.TimeoutError):
+                    reply = ERROR
+                writer.write((reply + CR).encode() + PROMPT if reply else PROMPT)
+                await writer.drain()
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError,
+            ConnectionError,
+        ):
+            pass
+        finally:
+            self._clients.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _handle_json(self, reader, writer):
+        self._clients[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self._json_request(line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _json_request(self, line):
+        try:
+            request = json.loads(line)
+            projector = self._projectors[request["host"]]
+        except (ValueError, TypeError, KeyError):
+            return {"error": "invalid request"}
+        reply = {"host": request["host"]}
+        try:
+            if isinstance(request.get("get"), list):
+                reply["values"] = await self._json_get(projector, request["get"])
+            elif isinstance(request.get("send"), str):
+                command = resolve_command(request["send"])
+                if command is None:
+                    reply["error"] = f"{request['send']} unknown"
+                elif await projector.send_command(command) is False:
+                    reply["error"] = f"{request['send']} rejected"
+                else:
+                    reply["sent"] = request["send"]
+            else:
+                reply["error"] = "invalid request"
+        except asyncio.TimeoutError:
+            reply["error"] = "timeout"
+        except ProjectorError as err:
+            reply["error"] = type(err).__name__
+        return reply
+
+    @staticmethod
+    async def _json_get(projector, names):
+        """Return values of properties, False for unknown ones."""
+        queries = {name: resolve_query(name) for name in names if isinstance(name, str)}
+        known = [query for query in queries.values() if query]
+        values = {}
+        if known:
+            values = await projector.get_properties(known, priority=PRIORITY_COMMAND)
+        return {name: values.get(query, False) for name, query in queries.items()}
+
+
+async def main(args):
+    """Serve projectors given on command line until interrupted."""
+    gateway = ProjectorGateway(cache_ttl=args.cache_ttl)
+    for upstream in args.projectors:
+        host, _, listen_port = upstream.partition("=")
+        port = await gateway.add_projector(
+            host, int(listen_port or 0), listen_host=args.listen
+        )
+        _LOGGER.info("Serving %s on port %d", host, port)
+    if args.json_port is not None:
+        port = await gateway.start_json(args.json_port, listen_host=args.listen)
+        _LOGGER.info("Serving JSON clients on port %d", port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await gateway.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "projectors", nargs="+", help="Projector host, optionally =local port"
+    )
+    parser.add_argument("--json-port", type=int)
+    parser.add_argument("--listen", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -1,32 +1,37 @@
 """Lock to prevent sending multiple command at once to Epson projector."""
 
 import time
-from .const import (TURN_ON, TURN_OFF, INV_SOURCES, SOURCE, ALL, TIMEOUT_TIMES, DEFAULT_TIMEOUT_TIME)
+from .commands import get_command
+from .const import ALL, TIMEOUT_TIMES, DEFAULT_TIMEOUT_TIME, TURN_OFF, TURN_ON
 
 
 class Lock:
+    """
+    Busy windows of projector after commands, scoped per category.
+
+    A command locks only properties it changes: after a source change
+    source queries wait, while volume or color mode can still be read.
+    Power transitions lock everything except queries projector answers
+    while warming up or cooling down, and commands which can change any
+    property lock all requests.
+    """
+
     def __init__(self):
         """Init lock for sending request to projector when it is busy."""
-        self._isLocked = False
-        self._timer = 0
-        self._operation = False
+        self._scopes = {}
 
     def setLock(self, command):
-        """Set lock on requests."""
-        if command in (TURN_ON, TURN_OFF):
-            self._operation = command
-        elif command in INV_SOURCES:
-            self._operation = SOURCE
-        else:
-            self._operation = ALL
-        self._isLocked = True
-        self._timer = time.time()
-
-    def __unlock(self):
-        """Unlock sending requests to projector."""
-        self._operation = False
-        self._timer = 0
-        self._isLocked = False
+        """Set lock on requests related to command."""
+        command = get_command(command)
+        self._scopes[command.lock_category] = (
+            time.monotonic()
+            + TIMEOUT_TIMES.get(command.lock_category, DEFAULT_TIMEOUT_TIME),
+            command.scope,
+        )
+
+    def release(self, category):
+        """Unlock requests locked by command category before its timeout."""
+        self._scopes.pop(category, None)
 
     def checkLock(self):
         """
@@ -35,9 +40,32 @@ class Lock:
         Check if there is lock pending and check if enough time
         passed so requests can be unlocked.
         """
-        if self._isLocked:
-            if (time.time() - self._timer) > TIMEOUT_TIMES.get(self._operation, DEFAULT_TIMEOUT_TIME):
-                self.__unlock()
-                return False
-            return True
-        return False
+        return self.remaining() > 0
+
+    def remaining(self, *commands):
+        """
+        Return seconds left until commands can be sent to projector.
+
+        Without commands any pending lock counts.
+        """
+        if not self._scopes:
+            return 0
+        now = time.monotonic()
+        remaining = 0
+        for category, (deadline, scope) in list(self._scopes.items()):
+            if deadline <= now:
+                del self._scopes[category]
+            elif not commands or any(
+                _blocks(category, scope, get_command(command)) for command in commands
+            ):
+                remaining = max(remaining, deadline - now)
+        return remaining
+
+
+def _blocks(category, scope, command):
+    """Return True if lock of category and scope holds command back."""
+    if category in (TURN_ON, TURN_OFF):
+        return not command.power_safe
+    if ALL in scope or ALL in command.scope:
+        return True
+    return not scope.isdisjoint(command.scope)
@@ -0,0 +1,107 @@
+"""Persistent metadata of Epson projectors."""
+import json
+import logging
+import os
+import time
+
+from .const import BUSY, ERROR, STATE_UNAVAILABLE
+
+_LOGGER = logging.getLogger(__name__)
+
+METADATA_VERSION = 1
+SERIAL = "serial"
+CAPABILITIES = "capabilities"
+CAPABILITIES_SERIAL = "capabilities_serial"
+STATE = "state"
+UPDATED = "updated"
+
+
+class MetadataStore:
+    """
+    On-disk store of projector metadata keyed by host.
+
+    Serial number, supported commands and last known property values
+    are kept in one JSON file, read at once by load, so a service knows
+    its projectors at startup without asking any of them. Projector does
+    not read the model, callers can keep it or other fields with update.
+    Changes are kept in memory until save, which replaces the file
+    atomically.
+    """
+
+    def __init__(self, path):
+        """
+        Init empty store.
+
+        :param str path:    Path of JSON file, created on first save
+        """
+        self._path = path
+        self._devices = {}
+        self._dirty = False
+
+    @property
+    def path(self):
+        """Return path of store file."""
+        return self._path
+
+    def load(self):
+        """Read all records from file, missing or broken file gives empty store."""
+        try:
+            with open(self._path) as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as err:
+            _LOGGER.error("Cannot read projector metadata %s: %s", self._path, err)
+            data = {}
+        if data.get("version", METADATA_VERSION) != METADATA_VERSION:
+            _LOGGER.warning("Ignoring metadata of version %s", data.get("version"))
+            data = {}
+        self._devices = data.get("devices", {})
+        self._dirty = False
+        return self
+
+    def save(self):
+        """Write records to file if anything changed since load or last save."""
+        if not self._dirty:
+            return
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w") as fh:
+            json.dump({"version": METADATA_VERSION, "devices": self._devices}, fh)
+        os.replace(temp_path, self._path)
+        self._dirty = False
+
+    def hosts(self):
+        """Return hosts with stored metadata."""
+        return list(self._devices)
+
+    def get(self, host):
+        """Return copy of record of host, empty dict if unknown."""
+        return dict(self._devices.get(host, {}))
+
+    def update(self, host, **fields):
+        """Update fields of record of host, like serial or model."""
+        record = self._devices.setdefault(host, {})
+        changed = {
+            key: value for key, value in fields.items() if record.get(key) != value
+        }
+        if changed:
+            record.update(changed)
+            record[UPDATED] = time.time()
+            self._dirty = True
+
+    def update_state(self, host, values):
+        """Merge property values into last known state of host."""
+        state = {
+            command: value
+            for command, value in values.items()
+            if value not in (False, None, BUSY, ERROR, STATE_UNAVAILABLE)
+        }
+        if state:
+            self.update(
+                host, state={**self._devices.get(host, {}).get(STATE, {}), **state}
+            )
+
+    def forget(self, host):
+        """Remove record of host."""
+        if self._devices.pop(host, None) is not None:
+            self._dirty = True
@@ -1,13 +1,62 @@
 """Main of Epson projector module."""
+
 import logging
+import time
+
+import asyncio
 
-from .const import BUSY, TCP_PORT, HTTP_PORT, POWER, HTTP, TCP, SERIAL
-from .timeout import get_timeout
+from .const import (
+    ALL,
+    BUSY,
+    EPSON_CODES,
+    ERROR,
+    STATE_UNAVAILABLE,
+    TCP_PORT,
+    TCP_SERIAL_PORT,
+    HTTP_PORT,
+    POWER,
+    VOLUME,
+    HTTP,
+    TCP,
+    SERIAL,
+    REPLAY,
+    TURN_ON,
+    TURN_OFF,
+)
+from .timeout import AdaptiveTimeout, get_timeout
 
+from .cache import PropertyCache
+from .commands import (
+    CAPABILITY_QUERIES,
+    STEPPED_PROPERTIES,
+    command_target,
+    get_command,
+)
+from .error import ProjectorUnavailableError
 from .lock import Lock
+from .metadata import CAPABILITIES, CAPABILITIES_SERIAL, SERIAL as SERIAL_NUMBER
+from .scheduler import (
+    CommandScheduler,
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_POWER,
+)
+from .state import STATE_PROPERTIES, ProjectorState
+from .stats import OUTCOME_TIMEOUT, OUTCOME_UNAVAILABLE, RequestStats, classify
+from .subscription import Subscription
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delays of readiness probes ending busy window of command early.
+POWER_PROBE_DELAY = 2
+READY_PROBE_DELAY = 0.5
+READY_PROBE_BACKOFF = 1.5
+READY_PROBE_MAX_DELAY = 8
+# Queries sent in one batch by capability discovery.
+CAPABILITY_BATCH = 8
+# Rounds of key presses before stepped setter gives up on reaching target.
+MAX_STEP_ROUNDS = 3
+
 
 class Projector:
     """
@@ -22,46 +71,132 @@ class Projector:
         websession=None,
         type=HTTP,
         timeout_scale=1.0,
+        cache_ttl=None,
+        port=None,
+        serial_port=TCP_SERIAL_PORT,
+        adaptive_timeout=False,
+        metadata=None,
+        record=None,
+        replay_speed=1.0,
     ):
         """
         Epson Projector controller.
 
         :param str host:        Hostname/IP/serial to the projector
-        :param obj websession:  Websession to pass for HTTP protocol
+        :param obj websession:  Websession to pass for HTTP protocol, None to use
+                                pooled session shared by projectors
         :param timeout_scale    Factor to multiply default timeouts by (for slow projectors)
+        :param cache_ttl        Seconds to cache property values, or dict of command
+                                to seconds with ALL as default. Disabled by default.
+        :param int port:        Port of HTTP or ESC/VP.net, default for type if None
+        :param int serial_port: Port to ask for serial number over HTTP and TCP
+        :param adaptive_timeout Learn timeouts from observed latency, with default
+                                timeouts times timeout_scale as upper bounds
+        :param metadata         MetadataStore to keep serial number and last known
+                                state in, so they are known without asking projector
+        :param str record:      Path of file to append every exchange with
+                                projector to, with timings
+        :param replay_speed     Speed up factor of REPLAY type, 0 for no delays.
+                                Host of REPLAY is path of recording to answer from
 
         """
         self._lock = Lock()
+        self._scheduler = CommandScheduler(self._lock)
+        self._cache = PropertyCache(cache_ttl) if cache_ttl else None
+        self._subscriptions = set()
+        self._stats = RequestStats()
+        self._adaptive_timeout = None
+        if adaptive_timeout:
+            self._adaptive_timeout = AdaptiveTimeout()
         self._type = type
         self._timeout_scale = timeout_scale
         self._power = None
+        self._ready_probes = {}
+        self._metadata = metadata
+        self._capabilities = None
+        self._capabilities_serial = None
+        self._unsupported = frozenset()
+        self._absolute_unsupported = set()
         if self._type == HTTP:
             self._host = host
             from .projector_http import ProjectorHttp
 
             self._projector = ProjectorHttp(
-                host=host, websession=websession, port=HTTP_PORT
+                host=host,
+                websession=websession,
+                port=port or HTTP_PORT,
+                serial_port=serial_port,
             )
         elif self._type == TCP:
             from .projector_tcp import ProjectorTcp
 
             self._host = host
-            self._projector = ProjectorTcp(host, TCP_PORT)
+            self._projector = ProjectorTcp(host, port or TCP_PORT, serial_port)
         elif self._type == SERIAL:
             from .projector_serial import ProjectorSerial
 
             self._host = host
             self._projector = ProjectorSerial(host)
+        elif self._type == REPLAY:
+            from .recording import ProjectorReplay
+
+            self._host = host
+            self._projector = ProjectorReplay(host, replay_speed)
+        if record is not None:
+            from .recording import RecordingTransport, TrafficRecorder
+
+            self._projector = RecordingTransport(
+                self._projector, TrafficRecorder(record, self._type, host)
+            )
+        stored = self.metadata
+        if CAPABILITIES in stored:
+            self._set_capabilities(
+                stored[CAPABILITIES], stored.get(CAPABILITIES_SERIAL)
+            )
+
+    @property
+    def host(self):
+        """Return host of projector."""
+        return self._host
+
+    @property
+    def type(self):
+        """Return type of connection to projector."""
+        return self._type
 
     def close(self):
         """Close connection. Not used in HTTP"""
+        for probe in self._ready_probes.values():
+            probe.cancel()
+        self._ready_probes = {}
         self._projector.close()
 
     def set_timeout_scale(self, timeout_scale=1.0):
         self._timeout_scale = timeout_scale
 
+    def _timeout(self, command):
+        """Return timeout of command, learned one in adaptive mode."""
+        if self._adaptive_timeout is not None:
+            return self._adaptive_timeout.get(command, self._timeout_scale)
+        return get_timeout(command, self._timeout_scale)
+
+    @property
+    def metadata(self):
+        """Return stored metadata record of projector, empty without store."""
+        if self._metadata is None:
+            return {}
+        return self._metadata.get(self._host)
+
     async def get_serial_number(self):
-        return await self._projector.get_serial()
+        """Get serial number, from metadata store if it is known there."""
+        if self._metadata is not None:
+            serial = self._metadata.get(self._host).get(SERIAL_NUMBER)
+            if serial:
+                return serial
+        serial = await self._projector.get_serial()
+        if serial and self._metadata is not None:
+            self._metadata.update(self._host, serial=serial)
+        return serial
 
     async def get_power(self):
         """Get Power info."""
@@ -71,27 +206,424 @@ class Projector:
             self._power = power
         return self._power
 
-    async def get_property(self, command, timeout=None):
-        """Get property state from device."""
+    async def get_property(self, command, timeout=None, priority=PRIORITY_POLL):
+        """
+        Get property state from device.
+
+        Waits for its turn in the scheduler instead of returning BUSY
+        while projector is handling previous command related to it.
+        """
         _LOGGER.debug("Getting property %s", command)
-        timeout = timeout if timeout else get_timeout(command, self._timeout_scale)
-        if self._lock.checkLock():
-            return BUSY
-        return await self._projector.get_property(command=command, timeout=timeout)
+        if command in self._unsupported:
+            return False
+        timeout = timeout if timeout else self._timeout(command)
+        if self._cache is None:
+            return await self._get_property(command, timeout, priority)
+        return await self._cache.get(
+            command, lambda: self._get_property(command, timeout, priority)
+        )
+
+    async def _get_property(self, command, timeout, priority, ignore_lock=False):
+        async with self._scheduler.slot(priority, command, ignore_lock=ignore_lock):
+            start = time.monotonic()
+            value = await self._recorded(
+                (command,),
+                start,
+                self._projector.get_property(command=command, timeout=timeout),
+            )
+        if self._metadata is not None:
+            self._metadata.update_state(self._host, {command: value})
+        return False if value == ERROR else value
+
+    async def get_properties(self, commands, timeout=None, priority=PRIORITY_POLL):
+        """
+        Get several properties state from device.
+
+        Returns dict of command to value. Over TCP all queries are
+        pipelined on the connection so it costs about one round trip.
+        Queries known to be unsupported are answered with False locally.
+
+        Properties projector is busy changing after a command do not hold
+        back the others. Background polls, at PRIORITY_POLL, get BUSY for
+        them right away, higher priorities wait only for them, after the
+        rest is read.
+        """
+        _LOGGER.debug("Getting properties %s", commands)
+        if not commands:
+            return {}
+        values = {}
+        if self._unsupported:
+            values = {
+                command: False for command in commands if command in self._unsupported
+            }
+            commands = [command for command in commands if command not in values]
+            if not commands:
+                return values
+        if self._cache is not None:
+            for command in commands:
+                value = self._cache.peek(command)
+                if value is not None:
+                    values[command] = value
+            commands = [command for command in commands if command not in values]
+            if not commands:
+                return values
+            generation = self._cache.generation
+        locked = [command for command in commands if self._lock.remaining(command)]
+        ready = [command for command in commands if command not in locked]
+        if priority == PRIORITY_POLL:
+            values.update(dict.fromkeys(locked, BUSY))
+            locked = []
+        fetched = {}
+        for batch in (ready, locked):
+            if not batch:
+                continue
+            batch_timeout = timeout or max(self._timeout(command) for command in batch)
+            fetched.update(
+                (command, False if value == ERROR else value)
+                for command, value in (
+                    await self._fetch(batch, batch_timeout, priority)
+                ).items()
+            )
+        if self._metadata is not None:
+            self._metadata.update_state(self._host, fetched)
+        if self._cache is not None:
+            for command, value in fetched.items():
+                self._cache.store(command, value, generation)
+        values.update(fetched)
+        return values
+
+    async def _fetch(self, commands, timeout, priority):
+        """Get properties from connection, ERROR for rejected queries."""
+        async with self._scheduler.slot(priority, *commands):
+            start = time.monotonic()
+            return await self._recorded(
+                commands,
+                start,
+                self._projector.get_properties(commands=commands, timeout=timeout),
+            )
+
+    @property
+    def capabilities(self):
+        """Return dict of query to True if projector supports it, None if unknown."""
+        return None if self._capabilities is None else dict(self._capabilities)
+
+    async def discover_capabilities(self, commands=CAPABILITY_QUERIES, force=False):
+        """
+        Find queries projector supports, the ones answered with ERR are not.
+
+        Results are kept in metadata store with serial number of projector
+        and probed again only when another projector answers at the host,
+        or with force. Queries left without answer, like on a slow model,
+        are probed again on next call. Projector must be turned on, as in
+        standby most queries are rejected, otherwise known capabilities are
+        returned.
+        """
+        serial = await self._projector.get_serial()
+        known = {}
+        if (
+            not force
+            and self._capabilities is not None
+            and (serial is None or serial == self._capabilities_serial)
+        ):
+            known = self._capabilities
+        pending = [command for command in commands if command not in known]
+        if not pending:
+            return self.capabilities
+        if (
+            await self.get_property(POWER, priority=PRIORITY_COMMAND)
+            != EPSON_CODES[POWER]
+        ):
+            _LOGGER.warning(
+                "Projector %s is not on, capabilities not probed", self._host
+            )
+            return self.capabilities
+        values = {}
+        for index in range(0, len(pending), CAPABILITY_BATCH):
+            batch = pending[index : index + CAPABILITY_BATCH]
+            values.update(
+                await self._fetch(
+                    batch,
+                    max(self._timeout(command) for command in batch),
+                    PRIORITY_COMMAND,
+                )
+            )
+        capabilities = dict(known)
+        capabilities.update(
+            (command, value != ERROR)
+            for command, value in values.items()
+            if value not in (False, None, BUSY, STATE_UNAVAILABLE)
+        )
+        self._set_capabilities(capabilities, serial)
+        if self._metadata is not None:
+            self._metadata.update(
+                self._host, capabilities=capabilities, capabilities_serial=serial
+            )
+            if serial:
+                self._metadata.update(self._host, serial=serial)
+        return self.capabilities
+
+    def _set_capabilities(self, capabilities, serial):
+        self._capabilities = capabilities
+        self._capabilities_serial = serial
+        self._unsupported = frozenset(
+            command for command, supported in capabilities.items() if not supported
+        )
+
+    async def get_state(self, timeout=None, priority=PRIORITY_POLL):
+        """Get decoded snapshot of power, source, color mode and volume."""
+        values = await self.get_properties(
+            [prop for prop, _ in STATE_PROPERTIES.values()], timeout, priority
+        )
+        return ProjectorState.from_properties(values)
 
     async def send_command(self, command):
         """Send command to Epson."""
         _LOGGER.debug("Sending command to projector %s", command)
-        if self._lock.checkLock():
+        priority = (
+            PRIORITY_POWER if command in (TURN_ON, TURN_OFF) else PRIORITY_COMMAND
+        )
+        async with self._scheduler.slot(priority, command):
+            self._lock.setLock(command)
+            if self._cache is not None:
+                self._cache.invalidate_command(command)
+            response = await self._recorded(
+                (command,),
+                time.monotonic(),
+                self._projector.send_command(command, self._timeout(command)),
+            )
+        target = command_target(command)
+        if target is not None and response is not False:
+            self._start_ready_probe(command, *target)
+        self._kick_subscriptions()
+        return response
+
+    async def set_volume(self, target):
+        """Set volume to target value, True when projector reports it."""
+        return await self.set_stepped(VOLUME, target)
+
+    async def set_stepped(self, property, target):
+        """
+        Set stepped property, like VOLUME, to target value.
+
+        Current value is read once and the absolute ESC/VP21 command is
+        sent. Models rejecting it get the needed number of key presses
+        sent in one batch, with one busy window for all of them. Returns
+        True when projector reports target value.
+
+        :param str property:    Key of STEPPED_PROPERTIES
+        :param int target:      Value to set
+        """
+        escvp, up, down = STEPPED_PROPERTIES[property]
+        current = await self._get_int(property)
+        if current is None:
             return False
-        self._lock.setLock(command)
-        return await self._projector.send_command(
-            command, get_timeout(command, self._timeout_scale)
+        if current == target:
+            return True
+        if property not in self._absolute_unsupported:
+            command = f"{escvp} {target}"
+            if await self.send_command(command) is not False:
+                current = await self._read_back(property, command)
+                if current == target:
+                    return True
+            _LOGGER.debug("Absolute %s not supported, using keys", property)
+            self._absolute_unsupported.add(property)
+            if current is None:
+                return False
+        step = 1
+        for _ in range(MAX_STEP_ROUNDS):
+            presses = round(abs(target - current) / step)
+            if presses == 0:
+                break
+            command = up if target > current else down
+            if not await self._send_keys(command, presses):
+                return False
+            value = await self._read_back(property, command)
+            if value is None:
+                return False
+            if value != current:
+                step = abs(value - current) / presses
+            current = value
+            if current == target:
+                return True
+        return current == target
+
+    async def _get_int(self, property):
+        value = await self.get_property(property, priority=PRIORITY_COMMAND)
+        return self._int_value(value)
+
+    async def _read_back(self, property, command):
+        """
+        Read stepped property right after command changing it.
+
+        Projector replies to command once it is handled, so the value is
+        read through busy window of command, which ends when it is read.
+        """
+        value = self._int_value(
+            await self._get_property(
+                property, self._timeout(property), PRIORITY_COMMAND, ignore_lock=True
+            )
+        )
+        if value is not None:
+            self._end_busy(command)
+        return value
+
+    @staticmethod
+    def _int_value(value):
+        if value is False:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    async def _send_keys(self, command, presses):
+        """Send key presses in one batch, locking projector only once."""
+        async with self._scheduler.slot(PRIORITY_COMMAND, command):
+            self._lock.setLock(command)
+            if self._cache is not None:
+                self._cache.invalidate_command(command)
+            response = await self._recorded(
+                (command,),
+                time.monotonic(),
+                self._projector.send_commands(
+                    [command] * presses, self._timeout(command)
+                ),
+                replies=presses,
+            )
+        self._kick_subscriptions()
+        return response
+
+    def _end_busy(self, command):
+        """Release lock of command before its busy window ends, it is done."""
+        compiled = get_command(command)
+        self._lock.release(compiled.lock_category)
+        self._scheduler.wakeup()
+        self.invalidate_cache(compiled.touches)
+        self._kick_subscriptions()
+
+    def _kick_subscriptions(self):
+        for subscription in list(self._subscriptions):
+            subscription.kick()
+
+    def _start_ready_probe(self, command, prop, values):
+        probe = self._ready_probes.pop(prop, None)
+        if probe is not None:
+            probe.cancel()
+        self._ready_probes[prop] = asyncio.ensure_future(
+            self._probe_ready(command, prop, values)
         )
 
+    async def _probe_ready(self, command, prop, values):
+        """
+        Poll property changed by command during its busy window.
+
+        Lock is released as soon as projector reports target value, so
+        waiting requests do not wait out the whole TIMEOUT_TIMES window,
+        which stays as a ceiling.
+        """
+        power = prop == POWER
+        delay = POWER_PROBE_DELAY if power else READY_PROBE_DELAY
+        priority = PRIORITY_POWER if power else PRIORITY_COMMAND
+        while self._lock.remaining(command) > 0:
+            await asyncio.sleep(min(delay, self._lock.remaining(command)))
+            delay = min(delay * READY_PROBE_BACKOFF, READY_PROBE_MAX_DELAY)
+            try:
+                value = await self._get_property(
+                    prop, self._timeout(prop), priority, ignore_lock=True
+                )
+            except (ProjectorUnavailableError, asyncio.TimeoutError):
+                continue
+            if value in values:
+                _LOGGER.debug("Projector reached %s %s", prop, value)
+                if power:
+                    self._power = value
+                self._end_busy(command)
+                break
+        self._ready_probes.pop(prop, None)
+
     async def send_request(self, command):
         """Get property state from device."""
         _LOGGER.debug("Getting property %s", command)
-        if self._lock.checkLock():
-            return BUSY
-        return await self._projector.send_request(params=command, timeout=10)
+        async with self._scheduler.slot(PRIORITY_COMMAND):
+            return await self._recorded(
+                (command,),
+                time.monotonic(),
+                self._projector.send_request(params=command, timeout=10),
+            )
+
+    async def _recorded(self, commands, start, request, replies=None):
+        """
+        Await request to connection and record outcome of its commands.
+
+        :param int replies: Number of replies request waited for, default
+                            number of commands
+        """
+        try:
+            value = await request
+        except ProjectorUnavailableError:
+            self._record(commands, start, OUTCOME_UNAVAILABLE, replies)
+            raise
+        except asyncio.TimeoutError:
+            self._record(commands, start, OUTCOME_TIMEOUT, replies)
+            raise
+        failure = getattr(self._projector, "last_failure", None)
+        latency = time.monotonic() - start
+        if isinstance(value, dict):
+            outcomes = {
+                command: classify(value.get(command), failure) for command in commands
+            }
+        else:
+            outcomes = {commands[0]: classify(value, failure)}
+        self._observe(outcomes, latency, replies)
+        return value
+
+    def _record(self, commands, start, outcome, replies=None):
+        self._observe(
+            {command: outcome for command in commands},
+            time.monotonic() - start,
+            replies,
+        )
+
+    def _observe(self, outcomes, latency, replies):
+        for command, outcome in outcomes.items():
+            self._stats.record(self._type, command, outcome, latency)
+        if self._adaptive_timeout is not None:
+            self._adaptive_timeout.observe_batch(outcomes, latency, replies)
+
+    def stats(self):
+        """Return snapshot of request statistics and scheduler queue."""
+        stats = {
+            "requests": self._stats.snapshot(),
+            "scheduler": self._scheduler.stats(),
+        }
+        if self._adaptive_timeout is not None:
+            stats["timeouts"] = self._adaptive_timeout.estimates()
+        return stats
+
+    def add_stats_hook(self, hook):
+        """
+        Call hook with transport, command, outcome and latency of every request.
+
+        Returns function removing the hook.
+        """
+        return self._stats.add_hook(hook)
+
+    def subscribe(self, properties, **kwargs):
+        """
+        Subscribe to changes of properties.
+
+        Returns async iterator of ChangeEvent, see Subscription for
+        poll interval options. Close it when no longer needed.
+        """
+        subscription = Subscription(self, properties, **kwargs)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def invalidate_cache(self, properties=(ALL,)):
+        """Drop cached values of properties, all of them by default."""
+        if self._cache is not None:
+            self._cache.invalidate(properties)
+
+    def scheduler_stats(self):
+        """Return queue depth and wait times of requests to projector."""
+        return self._scheduler.stats()
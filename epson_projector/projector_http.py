@@ -4,12 +4,12 @@ import logging
 import aiohttp
 import asyncio
 import async_timeout
+from yarl import URL
 
 from .const import (
     ACCEPT_ENCODING,
     ACCEPT_HEADER,
     BUSY,
-    EPSON_KEY_COMMANDS,
     DIRECT_SEND,
     HTTP_OK,
     STATE_UNAVAILABLE,
@@ -19,12 +19,84 @@ from .const import (
     SERIAL_BYTE,
     JSON_QUERY,
 )
+from .commands import get_command
 from .error import ProjectorUnavailableError
 from .timeout import get_timeout
 
 _LOGGER = logging.getLogger(__name__)
 
 
+CONNECTIONS_PER_HOST = 2
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+
+class _SharedSession:
+    """
+    Sessions shared by projectors created without websession.
+
+    aiohttp sessions belong to the event loop they were created in, so
+    there is one per running loop. One connector serves all projectors of
+    the loop, limiting connections per projector and keeping them alive
+    between polls. Session is closed in its loop when the last projector
+    using it is closed.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def acquire(self):
+        """Return session of running loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._sessions if other.is_closed()]:
+            del self._sessions[other]
+        entry = self._sessions.get(loop)
+        if entry is None or entry[0].closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=CONNECTIONS_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            entry = self._sessions[loop] = [
+                aiohttp.ClientSession(connector=connector),
+                0,
+            ]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, session):
+        """Close session when it is not used anymore, from inside its loop."""
+        for loop, entry in self._sessions.items():
+            if entry[0] is session:
+                break
+        else:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del self._sessions[loop]
+        if loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(session.close())
+        elif loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        elif running is None:
+            loop.run_until_complete(session.close())
+        else:
+            # Another loop runs here, idle loop of session closes it when
+            # it runs again, or aiohttp warns about it when collected.
+            _LOGGER.debug("Shared session left to its idle event loop")
+            loop.create_task(session.close())
+
+
+_shared_session = _SharedSession()
+
+
 class ProjectorHttp:
     """
     Epson projector class.
@@ -32,17 +104,25 @@ class ProjectorHttp:
     Control your projector with Python.
     """
 
-    def __init__(self, host, websession, port=80):
+    def __init__(self, host, websession=None, port=80, serial_port=TCP_SERIAL_PORT):
         """
         Epson Projector controller.
 
         :param str host:        IP address or hostname of Projector
+        :param obj websession:  Websession to use, None to use pooled session
+                                shared by projectors
         :param int port:        Port to connect to. Default 80.
+        :param int serial_port: Port to ask for serial number. Default 3620.
         :param bool encryption: User encryption to connect
 
         """
         self._host = host
+        self._serial_port = serial_port
         self._http_url = f"http://{self._host}:{port}/cgi-bin/"
+        self._urls = {
+            type: URL(f"{self._http_url}{type}") for type in (JSON_QUERY, DIRECT_SEND)
+        }
+        self._command_urls = {}
         self._headers = {
             "Accept-Encoding": ACCEPT_ENCODING,
             "Accept": ACCEPT_HEADER,
@@ -50,14 +130,29 @@ class ProjectorHttp:
         }
         self._serial = None
         self.websession = websession
+        self._owns_session = websession is None
+        self._session_loop = None
 
     def close(self):
-        return
+        """Release pooled session, websession given by caller is left open."""
+        if self._owns_session and self.websession is not None:
+            session, self.websession = self.websession, None
+            _shared_session.release(session)
+
+    def _command_url(self, command):
+        """Return URL with query of command, built once per projector."""
+        url = self._command_urls.get(command)
+        if url is None:
+            compiled = get_command(command)
+            url = self._command_urls[command] = self._urls[
+                compiled.http_type
+            ].with_query(compiled.http_params)
+        return url
 
     async def get_property(self, command, timeout):
         """Get property state from device."""
-        response = await self.send_request(
-            timeout=timeout, params=EPSON_KEY_COMMANDS[command], type=JSON_QUERY
+        response = await self._request(
+            self._command_url(command), timeout, JSON_QUERY
         )
         if not response:
             return False
@@ -68,20 +163,44 @@ class ProjectorHttp:
         except KeyError:
             return BUSY
 
+    async def get_properties(self, commands, timeout):
+        """Get several properties, one query after another."""
+        return {
+            command: await self.get_property(command, timeout) for command in commands
+        }
+
     async def send_command(self, command, timeout):
         """Send command to Epson."""
-        response = await self.send_request(
-            timeout=timeout, params=EPSON_KEY_COMMANDS[command], type=DIRECT_SEND
+        response = await self._request(
+            self._command_url(command), timeout, DIRECT_SEND
         )
         return response
 
+    async def send_commands(self, commands, timeout):
+        """Send several commands, one after another, False if any failed."""
+        for command in commands:
+            if not await self.send_command(command, timeout):
+                return False
+        return True
+
     async def send_request(self, params, timeout, type=JSON_QUERY):
         """Send request to Epson."""
+        return await self._request(self._urls[type].with_query(params), timeout, type)
+
+    async def _request(self, url, timeout, type):
+        """Send GET request to prebuilt URL."""
+        if self._owns_session:
+            loop = asyncio.get_running_loop()
+            if self.websession is not None and self._session_loop is not loop:
+                _shared_session.release(self.websession)
+                self.websession = None
+            if self.websession is None:
+                self.websession = _shared_session.acquire()
+                self._session_loop = loop
         try:
-            with async_timeout.timeout(timeout):
-                url = "{url}{type}".format(url=self._http_url, type=type)
+            async with async_timeout.timeout(timeout):
                 async with self.websession.get(
-                    url=url, params=params, headers=self._headers
+                    url=url, headers=self._headers
                 ) as response:
                     if response.status != HTTP_OK:
                         _LOGGER.warning("Error message %d from Epson.", response.status)
@@ -101,12 +220,12 @@ class ProjectorHttp:
         """Send TCP request for serial to Epson."""
         if not self._serial:
             try:
-                with async_timeout.timeout(10):
+                async with async_timeout.timeout(10):
                     power_on = await self.get_property(POWER, get_timeout(POWER))
                     if power_on == EPSON_CODES[POWER]:
                         reader, writer = await asyncio.open_connection(
                             host=self._host,
-                            port=TCP_SERIAL_PORT,
+                            port=self._serial_port,
                         )
                         _LOGGER.debug("Asking for serial number.")
                         writer.write(SERIAL_BYTE)
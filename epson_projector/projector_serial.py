@@ -4,7 +4,10 @@ import logging
 import asyncio
 import serial_asyncio
 from serial.serialutil import SerialException
-from .const import ESCVP_HELLO_COMMAND, COLON, CR, GET_CR, BUSY, ERROR, SNO
+from .commands import get_command
+from .const import ESCVP_HELLO_COMMAND, BUSY, ERROR, SNO
+from .framer import ERROR_BYTES, ResponseFramer, request_key
+from .stats import OUTCOME_TIMEOUT, OUTCOME_UNAVAILABLE
 import async_timeout
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,6 +34,8 @@ class ProjectorSerial:
         self._isOpen = False
         self._loop = asyncio.get_running_loop()
         self._serial = None
+        self._framer = ResponseFramer()
+        self.last_failure = None
 
     async def async_init(self):
         """Async init to open serial connection with projector."""
@@ -42,7 +47,7 @@ class ProjectorSerial:
             except:
                 pass
         try:
-            with async_timeout.timeout(DEFAULT_TIMEOUT):
+            async with async_timeout.timeout(DEFAULT_TIMEOUT):
                 (
                     self._reader,
                     self._writer,
@@ -51,9 +56,10 @@ class ProjectorSerial:
                 )
                 if self._reader and self._writer:
                     self._isOpen = True
+                    self._framer.reset()
                     self._writer.write(ESCVP_HELLO_COMMAND.encode())
-                    response = await self._reader.readuntil(COLON.encode())
-                    if str(response.decode().strip(CR)) == ":":
+                    response = await self._framer.read_response(self._reader, None)
+                    if response == b"":
                         _LOGGER.info("Connection open")
                         return True
                     else:
@@ -81,60 +87,95 @@ class ProjectorSerial:
             self._timeouts = 0
 
     def _check_timeout_reconnect(self):
+        """Reconnect only when projector stopped answering at all."""
         if self._timeouts >= MAX_TIMEOUTS:
             self._writer.close()
 
     async def get_property(self, command, timeout):
-        """Get property state from device."""
-        response = await self.send_request(timeout=timeout, command=command + GET_CR)
-        if not response:
-            return False
-        try:
-            return response.split("=")[1]
-        except KeyError:
-            return BUSY
-        except IndexError:
-            _LOGGER.error("Bad response %s", response)
+        """Get property state from device, ERROR if projector rejects query."""
+        command = get_command(command)
+        frame = await self._send(timeout, command.get_frame, command.reply_key)
+        if frame is None:
             return False
+        response = command.decode(frame)
+        if response is False:
+            _LOGGER.error("Bad response %s", frame)
+        return response
+
+    async def get_properties(self, commands, timeout):
+        """Get several properties, one query after another."""
+        return {
+            command: await self.get_property(command, timeout) for command in commands
+        }
 
     async def send_command(self, command, timeout):
         """Send command to Epson."""
-        response = await self.send_request(timeout=timeout, command=command + CR)
-        return response
+        frame = await self._send(timeout, get_command(command).set_frame, None)
+        if frame is None or frame == ERROR_BYTES:
+            return False
+        return frame.decode()
+
+    async def send_commands(self, commands, timeout):
+        """Send several commands, one after another, False if any was rejected."""
+        for command in commands:
+            if await self.send_command(command, timeout) is False:
+                return False
+        return True
 
     async def send_request(self, timeout, command):
         """Send request to Epson over serial."""
+        if not command:
+            return False
+        request = command.encode()
+        frame = await self._send(timeout, request, request_key(request))
+        if frame is None or frame == ERROR_BYTES:
+            return False
+        return frame.decode()
+
+    async def _send(self, timeout, request, key):
+        """
+        Send encoded request and return reply frame starting with key.
+
+        None is returned when there is no reply, last_failure tells why.
+        """
+        self.last_failure = None
         if self._writer and not self._isOpen:
             self._writer.close()
         if self._writer is None or self._writer.is_closing():
             await self.async_init()
-        if self._writer and self._isOpen and command:
-            try:
-                with async_timeout.timeout(timeout):
-                    _LOGGER.debug("Sent to Epson: %r with timeout %d", command, timeout)
-                    self._writer.write(command.encode())
-                    response = await self._reader.readuntil(COLON.encode())
-                    response = response[:-1].decode().rstrip(CR)
-                    _LOGGER.debug("Response from Epson %r", response)
-                    if response == ERROR:
-                        _LOGGER.error("Error response to request %r", command)
-                    else:
-                        return response
-            except asyncio.TimeoutError:
-                _LOGGER.error("Timeout error during sending request %r", command)
-                self._timeouts += 1
-                self._check_timeout_reconnect()
-            except SerialException as se:
-                _LOGGER.error(f"Error during serial write/read: {se}")
-                self.close()
-
-        return False
+        if not (self._writer and self._isOpen):
+            self.last_failure = OUTCOME_UNAVAILABLE
+            return None
+        try:
+            async with async_timeout.timeout(timeout):
+                _LOGGER.debug("Sent to Epson: %r with timeout %d", request, timeout)
+                self._writer.write(request)
+                frame = await self._framer.read_response(self._reader, key)
+                _LOGGER.debug("Response from Epson %r", frame)
+                self._timeouts = 0
+                if frame == ERROR_BYTES:
+                    _LOGGER.error("Error response to request %r", request)
+                return frame
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout error during sending request %r", request)
+            self.last_failure = OUTCOME_TIMEOUT
+            self._framer.resync()
+            self._timeouts += 1
+            self._check_timeout_reconnect()
+        except asyncio.CancelledError:
+            self._framer.resync()
+            raise
+        except (SerialException, ConnectionResetError) as se:
+            _LOGGER.error(f"Error during serial write/read: {se}")
+            self.last_failure = OUTCOME_UNAVAILABLE
+            self.close()
+        return None
 
     async def get_serial(self):
         """Send request for serial to Epson."""
         if not self._serial:
             response = await self.get_property(SNO, timeout=DEFAULT_TIMEOUT)
-            if not response or response == BUSY:
+            if not response or response in (BUSY, ERROR):
                 _LOGGER.error("Error retrieving serial number from projector")
             else:
                 self._serial = response
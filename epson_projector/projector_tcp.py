@@ -4,19 +4,16 @@ import logging
 import asyncio
 import async_timeout
 
+from .commands import get_command
+from .connection import CONNECT_TIMEOUT, TcpConnection
 from .const import (
-    BUSY,
-    ESCVPNET_HELLO_COMMAND,
-    ESCVPNETNAME,
-    ERROR,
-    CR,
-    CR_COLON,
-    GET_CR,
     EPSON_CODES,
     POWER,
     SERIAL_BYTE,
     TCP_SERIAL_PORT,
 )
+from .framer import ERROR_BYTES, request_key
+from .stats import OUTCOME_TIMEOUT, OUTCOME_UNAVAILABLE
 from .timeout import get_timeout
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,93 +24,142 @@ class ProjectorTcp:
     Epson TCP connector
     """
 
-    def __init__(self, host, port=3629):
+    def __init__(self, host, port=3629, serial_port=TCP_SERIAL_PORT):
         """
         Epson TCP connector
 
         :param str host:    IP address of Projector
         :param int port:    Port to connect to. Default 3629.
+        :param int serial_port: Port to ask for serial number. Default 3620.
         """
         self._host = host
         self._port = port
-        self._isOpen = False
+        self._serial_port = serial_port
         self._serial = None
         self._loop = asyncio.get_running_loop()
+        self._connection = TcpConnection(host, port)
+        self.last_failure = None
+        self._connection.start()
 
     async def async_init(self):
-        """Async init to open connection with projector."""
-        try:
-            with async_timeout.timeout(10):
-                self._reader, self._writer = await asyncio.open_connection(
-                    host=self._host, port=self._port, loop=self._loop
-                )
-                self._writer.write(ESCVPNET_HELLO_COMMAND.encode())
-                response = await self._reader.read(16)
-                if response[0:10].decode() == ESCVPNETNAME and response[14] == 32:
-                    self._isOpen = True
-                    _LOGGER.info("Connection open")
-                    return
-                else:
-                    _LOGGER.info("Cannot open connection to Epson")
-        except asyncio.TimeoutError:
-            _LOGGER.error("Timeout error")
-        except ConnectionRefusedError:
-            _LOGGER.error("Connection refused Error")
-        except OSError as err:
-            _LOGGER.error("No route to host? %s", err)
+        """Wait until background connection with projector is open."""
+        await self._connection.wait_connected(CONNECT_TIMEOUT)
 
     def close(self):
-        if self._isOpen:
-            self._writer.close()
+        self._connection.close()
+
+    async def get_property(self, command, timeout, bytes_to_read=None):
+        """
+        Get property state from device.
+
+        bytes_to_read is kept for compatibility, replies are framed
+        on the colon prompt whatever their length.
+        """
+        return (await self.get_properties([command], timeout))[command]
+
+    async def get_properties(self, commands, timeout):
+        """
+        Get several properties in one round trip.
 
-    async def get_property(self, command, timeout, bytes_to_read=16):
-        """Get property state from device."""
-        response = await self.send_request(
-            timeout=timeout, command=command + GET_CR, bytes_to_read=bytes_to_read
+        All queries are written back to back and the replies, each
+        terminated by the colon prompt, are matched to them in order.
+        """
+        compiled = [get_command(command) for command in commands]
+        frames = await self._send_requests(
+            timeout, [(command.get_frame, command.reply_key) for command in compiled]
         )
-        _LOGGER.debug("Response is %s", response)
-        if not response:
-            return False
-        try:
-            resp_beginning = f"{command}="
-            index_of_response = response.find(resp_beginning)
-            if index_of_response == -1:
-                return False
-            _response = response[index_of_response:].replace(resp_beginning, "")
-            if _response == ERROR:
-                return False
-            return _response
-        except KeyError:
-            return BUSY
+        _LOGGER.debug("Responses are %s", frames)
+        return {
+            command.name: False if frame is None else command.decode(frame)
+            for command, frame in zip(compiled, frames)
+        }
 
     async def send_command(self, command, timeout):
         """Send command to Epson."""
-        response = await self.send_request(timeout=timeout, command=command + CR)
-        return response
+        frames = await self._send_requests(
+            timeout, [(get_command(command).set_frame, None)]
+        )
+        return self._response(frames[0])
 
-    async def send_request(self, timeout, command, bytes_to_read=16):
+    async def send_commands(self, commands, timeout):
+        """Send several commands back to back, False if any was rejected."""
+        frames = await self._send_requests(
+            timeout, [(get_command(command).set_frame, None) for command in commands]
+        )
+        return all(self._response(frame) is not False for frame in frames)
+
+    async def send_request(self, timeout, command, bytes_to_read=None):
         """Send TCP request to Epson."""
-        if self._isOpen is False:
-            await self.async_init()
-        if self._isOpen and command:
-            bytes_to_read = bytes_to_read if bytes_to_read else 16
-            with async_timeout.timeout(timeout):
-                self._writer.write(command.encode())
-                response = await self._reader.read(bytes_to_read)
-                response = response.decode().replace(CR_COLON, "")
-                if response == ERROR:
-                    return False
-                return response
+        if not command:
+            return False
+        request = command.encode()
+        frames = await self._send_requests(timeout, [(request, request_key(request))])
+        return self._response(frames[0])
+
+    def _response(self, frame):
+        """Return decoded reply frame, False for ERR or no reply."""
+        if frame is None or frame == ERROR_BYTES:
+            return False
+        return frame.decode()
+
+    async def _send_requests(self, timeout, requests):
+        """
+        Write encoded requests and read one reply frame for each of them.
+
+        Requests are pairs of encoded request and expected reply prefix,
+        which is None for commands.
+
+        Projector answers requests one after another, so timeout applies
+        to each reply, counted from the previous one, not to the batch.
+        Requests left without reply get None and last_failure tells why.
+        After a timeout, or when caller is cancelled, the framer skips
+        their late replies, so the connection is kept open.
+        """
+        frames = [None] * len(requests)
+        connection = self._connection
+        self.last_failure = None
+        if not requests:
+            return frames
+        if not await connection.wait_connected(timeout):
+            self.last_failure = OUTCOME_UNAVAILABLE
+            return frames
+        received = 0
+        async with connection.lock:
+            if not connection.connected:
+                self.last_failure = OUTCOME_UNAVAILABLE
+                return frames
+            try:
+                connection.writer.write(b"".join(request for request, _ in requests))
+                for _, key in requests:
+                    async with async_timeout.timeout(timeout):
+                        frames[received] = await connection.framer.read_response(
+                            connection.reader, key
+                        )
+                    received += 1
+                connection.touch()
+            except asyncio.TimeoutError:
+                _LOGGER.error(
+                    "Timeout error during sending request %r", requests[received][0]
+                )
+                self.last_failure = OUTCOME_TIMEOUT
+                connection.framer.resync(len(requests) - received)
+            except asyncio.CancelledError:
+                connection.framer.resync(len(requests) - received)
+                raise
+            except OSError as err:
+                self.last_failure = OUTCOME_UNAVAILABLE
+                connection.connection_lost(err)
+        return frames
 
     async def get_serial(self):
         """Send TCP request for serial to Epson."""
         if not self._serial:
             try:
-                with async_timeout.timeout(10):
+                async with async_timeout.timeout(10):
                     power_on = await self.get_property(POWER, get_timeout(POWER))
                     if power_on == EPSON_CODES[POWER]:
                         reader, writer = await asyncio.open_connection(
-                            host=self._host, port=TCP_SERIAL_PORT, loop=self._loop
+                            host=self._host, port=self._serial_port
                         )
                         _LOGGER.debug("Asking for serial number.")
                         writer.write(SERIAL_BYTE)
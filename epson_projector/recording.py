@@ -0,0 +1,289 @@
+"""
+Recording and replay of traffic between Projector and its connection.
+
+Recording is a JSON lines file, only ever appended to. Every session
+starts with a header object with transport, host and wall clock start,
+followed by one array per exchange:
+
+    [offset, duration, method, argument, result, error, failure]
+
+offset and duration are seconds from session start, error and failure
+are left out when there are none. Keep one file per projector.
+"""
+import builtins
+import json
+import logging
+import time
+from collections import defaultdict, deque
+
+import asyncio
+
+from .const import HTTP
+from .error import ProjectorError, ProjectorUnavailableError
+from .stats import OUTCOME_TIMEOUT, OUTCOME_UNAVAILABLE
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+ERROR_TIMEOUT = "timeout"
+ERROR_UNAVAILABLE = "unavailable"
+
+
+def _encode(value):
+    """Return JSON representable result, objects like HTTP responses as True."""
+    if value is None or isinstance(value, (str, bool, int, float, list, dict)):
+        return value
+    return True
+
+
+class TrafficRecorder:
+    """Append exchanges with projector to recording file."""
+
+    def __init__(self, path, transport, host):
+        """
+        Open recording and start session.
+
+        :param str path:        Path of recording, appended to if it exists
+        :param str transport:   Type of connection, like TCP
+        :param str host:        Host of projector
+        """
+        self._path = path
+        self._start = time.monotonic()
+        self._file = open(path, "a", buffering=1)
+        self._write(
+            {
+                "version": RECORDING_VERSION,
+                "type": transport,
+                "host": host,
+                "start": time.time(),
+            }
+        )
+
+    @property
+    def path(self):
+        """Return path of recording file."""
+        return self._path
+
+    def record(self, method, argument, start, result, error=None, failure=None):
+        """Append one exchange started at monotonic time start."""
+        now = time.monotonic()
+        entry = [
+            round(start - self._start, 6),
+            round(now - start, 6),
+            method,
+            argument,
+            _encode(result),
+        ]
+        if error is not None or failure is not None:
+            entry += [error, failure]
+        self._write(entry)
+
+    def _write(self, data):
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps(data, separators=(",", ":")) + "\n")
+        except OSError as err:
+            _LOGGER.error("Cannot write recording %s: %s", self._path, err)
+
+    def close(self):
+        """Close recording file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RecordingTransport:
+    """Connection to projector passing every exchange to TrafficRecorder."""
+
+    def __init__(self, transport, recorder):
+        """
+        Wrap connection.
+
+        :param transport:   ProjectorHttp, ProjectorTcp or ProjectorSerial
+        :param recorder:    TrafficRecorder to write exchanges to
+        """
+        self._transport = transport
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._transport, name)
+
+    def close(self):
+        self._transport.close()
+        self._recorder.close()
+
+    async def _recorded(self, method, argument, request):
+        start = time.monotonic()
+        try:
+            result = await request
+        except asyncio.TimeoutError:
+            self._recorder.record(method, argument, start, None, ERROR_TIMEOUT)
+            raise
+        except ProjectorUnavailableError:
+            self._recorder.record(method, argument, start, None, ERROR_UNAVAILABLE)
+            raise
+        except (ProjectorError, OSError) as err:
+            self._recorder.record(method, argument, start, None, type(err).__name__)
+            raise
+        self._recorder.record(
+            method,
+            argument,
+            start,
+            result,
+            failure=getattr(self._transport, "last_failure", None),
+        )
+        return result
+
+    async def get_property(self, command, timeout):
+        return await self._recorded(
+            "get_property", command, self._transport.get_property(command, timeout)
+        )
+
+    async def get_properties(self, commands, timeout):
+        return await self._recorded(
+            "get_properties",
+            list(commands),
+            self._transport.get_properties(commands, timeout),
+        )
+
+    async def send_command(self, command, timeout):
+        return await self._recorded(
+            "send_command", command, self._transport.send_command(command, timeout)
+        )
+
+    async def send_commands(self, commands, timeout):
+        return await self._recorded(
+            "send_commands",
+            list(commands),
+            self._transport.send_commands(commands, timeout),
+        )
+
+    async def send_request(self, params, timeout):
+        return await self._recorded(
+            "send_request",
+            params,
+            self._transport.send_request(params=params, timeout=timeout),
+        )
+
+    async def get_serial(self):
+        return await self._recorded("get_serial", None, self._transport.get_serial())
+
+
+def _error_class(name):
+    """Return class of recorded error, ProjectorError unless it is OSError."""
+    error = getattr(builtins, name, None)
+    if isinstance(error, type) and issubclass(error, OSError):
+        return error
+    return ProjectorError
+
+
+def read_recording(path):
+    """Return list of sessions of recording, each (header, list of exchanges)."""
+    sessions = []
+    with open(path) as fh:
+        for number, line in enumerate(fh, 1):
+            try:
+                data = json.loads(line)
+            except ValueError:
+                _LOGGER.warning("Skipping broken line %d of %s", number, path)
+                continue
+            if isinstance(data, dict):
+                if data.get("version") != RECORDING_VERSION:
+                    _LOGGER.warning("Recording version %s", data.get("version"))
+                sessions.append((data, []))
+            elif sessions:
+                sessions[-1][1].append(data)
+    return sessions
+
+
+class ProjectorReplay:
+    """
+    Connection answering from recording instead of projector.
+
+    Every request gets the next recorded exchange with the same method and
+    argument, after its recorded duration divided by speed, so traffic of
+    real projectors can be replayed offline, deterministically, at real or
+    accelerated speed. Exchanges which took longer than timeout of request
+    time out like the recorded connection would. Requests missing from
+    recording get no reply.
+    """
+
+    def __init__(self, path, speed=1.0):
+        """
+        Load recording.
+
+        :param str path:    Path of recording written by TrafficRecorder
+        :param float speed: Factor to speed up replay by, 0 for no delays
+        """
+        self._speed = speed
+        self._exchanges = defaultdict(deque)
+        self._transport = None
+        self.last_failure = None
+        for header, exchanges in read_recording(path):
+            self._transport = self._transport or header.get("type")
+            for exchange in exchanges:
+                self._exchanges[self._key(exchange[2], exchange[3])].append(exchange)
+
+    @staticmethod
+    def _key(method, argument):
+        return method, json.dumps(argument)
+
+    def remaining(self):
+        """Return number of recorded exchanges not replayed yet."""
+        return sum(len(exchanges) for exchanges in self._exchanges.values())
+
+    def close(self):
+        pass
+
+    async def _replay(self, method, argument, timeout=None, no_reply=False):
+        self.last_failure = None
+        exchanges = self._exchanges.get(self._key(method, argument))
+        if not exchanges:
+            _LOGGER.warning("No recorded reply to %s %s", method, argument)
+            self.last_failure = OUTCOME_UNAVAILABLE
+            return no_reply
+        _, duration, _, _, result, *failure = exchanges.popleft()
+        error, self.last_failure = failure or (None, None)
+        if timeout is not None and error is None and duration > timeout:
+            await self._sleep(timeout)
+            if self._transport == HTTP:
+                raise ProjectorUnavailableError(ERROR_UNAVAILABLE)
+            self.last_failure = OUTCOME_TIMEOUT
+            return no_reply
+        await self._sleep(duration)
+        if error == ERROR_TIMEOUT:
+            raise asyncio.TimeoutError
+        if error == ERROR_UNAVAILABLE:
+            raise ProjectorUnavailableError(ERROR_UNAVAILABLE)
+        if error is not None:
+            raise _error_class(error)(error)
+        return result
+
+    async def _sleep(self, duration):
+        if self._speed:
+            await asyncio.sleep(duration / self._speed)
+
+    async def get_property(self, command, timeout):
+        return await self._replay("get_property", command, timeout)
+
+    async def get_properties(self, commands, timeout):
+        commands = list(commands)
+        return await self._replay(
+            "get_properties",
+            commands,
+            timeout,
+            no_reply={command: False for command in commands},
+        )
+
+    async def send_command(self, command, timeout):
+        return await self._replay("send_command", command, timeout)
+
+    async def send_commands(self, commands, timeout):
+        return await self._replay("send_commands", list(commands), timeout)
+
+    async def send_request(self, params, timeout):
+        return await self._replay("send_request", params, timeout)
+
+    async def get_serial(self):
+        return await self._replay("get_serial", None, no_reply=None)
@@ -0,0 +1,97 @@
+"""Scenes of commands run on Epson projectors."""
+import logging
+import time
+from collections import namedtuple
+
+import asyncio
+
+from .commands import command_target
+from .const import EPSON_KEY_COMMANDS
+from .error import ProjectorError
+from .scheduler import PRIORITY_COMMAND
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 64
+
+SceneResult = namedtuple(
+    "SceneResult", ["host", "executed", "skipped", "error", "duration"]
+)
+SceneResult.__doc__ = "Outcome of scene on one projector, error is None on success."
+
+
+class Scene:
+    """
+    Ordered list of commands, like power on, source and color mode.
+
+    Before each step its property is read and the step is skipped if
+    projector already is in its target state. Steps wait only for busy
+    windows of related previous steps, which Projector ends as soon as
+    its readiness probe sees their target state, instead of worst case
+    TIMEOUT_TIMES.
+    """
+
+    def __init__(self, steps):
+        """
+        Init scene.
+
+        :param list steps:  Names of EPSON_KEY_COMMANDS in order to run them
+        """
+        unknown = [step for step in steps if step not in EPSON_KEY_COMMANDS]
+        if unknown:
+            raise ValueError(f"Unknown scene steps: {', '.join(unknown)}")
+        self._steps = [(step, command_target(step)) for step in steps]
+
+    @property
+    def steps(self):
+        """Return names of commands of scene."""
+        return [step for step, _ in self._steps]
+
+    async def run(self, projector):
+        """Run scene on projector, return SceneResult."""
+        start = time.monotonic()
+        executed = []
+        skipped = []
+        error = None
+        try:
+            for command, target in self._steps:
+                if target is not None:
+                    prop, values = target
+                    current = await projector.get_property(
+                        prop, priority=PRIORITY_COMMAND
+                    )
+                    if current in values:
+                        skipped.append(command)
+                        continue
+                if await projector.send_command(command) is False:
+                    error = f"{command} rejected"
+                    break
+                executed.append(command)
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except (ProjectorError, OSError) as err:
+            _LOGGER.debug("Scene on %s failed: %r", projector.host, err)
+            error = type(err).__name__
+        return SceneResult(
+            host=projector.host,
+            executed=executed,
+            skipped=skipped,
+            error=error,
+            duration=time.monotonic() - start,
+        )
+
+    async def run_many(self, projectors, concurrency=DEFAULT_CONCURRENCY):
+        """Run scene on many projectors, yield SceneResult as they complete."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(projector):
+            async with semaphore:
+                return await self.run(projector)
+
+        tasks = [asyncio.ensure_future(limited(projector)) for projector in projectors]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield await done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,156 @@
+"""Scheduler of requests sent to Epson projector."""
+import asyncio
+import bisect
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+PRIORITY_POWER = 0
+PRIORITY_COMMAND = 1
+PRIORITY_POLL = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_POWER: "power",
+    PRIORITY_COMMAND: "command",
+    PRIORITY_POLL: "poll",
+}
+
+
+class _WaitStats:
+    """Wait time statistics of one priority class."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, wait):
+        self.count += 1
+        self.total += wait
+        if wait > self.max:
+            self.max = wait
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+        }
+
+
+class CommandScheduler:
+    """
+    Per projector scheduler of requests.
+
+    Only one request is sent to projector at a time. Waiting requests are
+    served by priority class, power first, then user commands and then
+    background polls, in arrival order within a class. While projector is
+    busy after a command, as tracked by Lock, requests wait instead of
+    being rejected. Requests unrelated to the command projector is busy
+    with are served meanwhile.
+    """
+
+    def __init__(self, lock):
+        """
+        Init scheduler.
+
+        :param Lock lock:   Lock tracking time projector needs after commands
+        """
+        self._lock = lock
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._active = False
+        self._timer = None
+        self._stats = {priority: _WaitStats() for priority in PRIORITY_NAMES}
+
+    @property
+    def queue_depth(self):
+        """Return number of requests waiting for their turn."""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority, *commands, ignore_lock=False):
+        """Wait for turn to talk to projector and hold it inside the block."""
+        await self.acquire(priority, *commands, ignore_lock=ignore_lock)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority, *commands, ignore_lock=False):
+        """
+        Wait until request of priority class can be sent to projector.
+
+        Request without commands waits for every lock to expire. Readiness
+        probes, checking if projector finished command early, ignore lock.
+        """
+        start = time.monotonic()
+        if ignore_lock:
+            commands = None
+        if self._active or self._waiters or self._remaining(commands) > 0:
+            future = asyncio.get_running_loop().create_future()
+            entry = (priority, next(self._sequence), commands, future)
+            bisect.insort(self._waiters, entry)
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    self._waiters.remove(entry)
+                    self._dispatch()
+                else:
+                    self.release()
+                raise
+        else:
+            self._active = True
+        self._stats[priority].add(time.monotonic() - start)
+
+    def release(self):
+        """Give turn to next waiting request."""
+        self._active = False
+        self._dispatch()
+
+    def wakeup(self):
+        """Check waiting requests again, after lock was released early."""
+        self._dispatch()
+
+    def stats(self):
+        """Return queue depth and wait time statistics per priority class."""
+        return {
+            "queue_depth": len(self._waiters),
+            "active": self._active,
+            "wait": {
+                PRIORITY_NAMES[priority]: stats.as_dict()
+                for priority, stats in self._stats.items()
+            },
+        }
+
+    def _remaining(self, commands):
+        """Return seconds request waits for lock, None commands ignore it."""
+        if commands is None:
+            return 0
+        return self._lock.remaining(*commands)
+
+    def _dispatch(self):
+        """Grant turn to first waiting request projector is ready for."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._active:
+            return
+        delay = None
+        for index, (_, _, commands, future) in enumerate(self._waiters):
+            if future.cancelled():
+                continue
+            remaining = self._remaining(commands)
+            if remaining <= 0:
+                del self._waiters[index]
+                self._active = True
+                future.set_result(None)
+                return
+            delay = remaining if delay is None else min(delay, remaining)
+        if delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
@@ -0,0 +1,377 @@
+"""
+Simulator of Epson projector for load and regression testing.
+
+It speaks ESC/VP.net over TCP, ESC/VP21 over a pseudo terminal,
+the json_query and directsend CGI endpoints used over HTTP and the
+serial number exchange, so all connection types can be used without
+hardware.
+"""
+
+import logging
+import os
+import random
+import time
+import tty
+
+import asyncio
+from aiohttp import web
+
+from .const import (
+    CR,
+    DIRECT_SEND,
+    EPSON_KEY_COMMANDS,
+    ERROR,
+    ESCVPNET_HELLO_COMMAND,
+    JSON_QUERY,
+    POWER,
+    PWR_COOLDOWN_STATE,
+    PWR_OFF_STATE,
+    PWR_WARMUP_STATE,
+    SERIAL_BYTE,
+    SNO,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PWR_ON_STATE = "01"
+HELLO_RESPONSE = (ESCVPNET_HELLO_COMMAND[:14] + "\x20\x00").encode()
+SERIAL_RESPONSE_HEADER = SERIAL_BYTE[:8] + bytes(16)
+DEFAULT_SERIAL_NUMBER = "SIM00001"
+
+DEFAULT_STATE = {
+    POWER: PWR_ON_STATE,
+    "SOURCE": "30",
+    "CMODE": "15",
+    "VOL": "10",
+    "LUMINANCE": "00",
+    "IMGPROC": "01",
+    "HDMILINK": "01",
+    "MUTE": "OFF",
+    "LAMP": "1234",
+}
+# Queries answered in standby, the rest give ERR like real projectors.
+STANDBY_QUERIES = (POWER, SNO, "LAMP")
+
+_SOURCE_KEYS = {
+    "HDMI1": "30",
+    "HDMI2": "A0",
+    "PC": "10",
+    "VIDEO": "40",
+    "USB": "52",
+    "LAN": "53",
+    "WFD": "56",
+}
+_KEY_CODES = {}
+for _name, _params in EPSON_KEY_COMMANDS.items():
+    if len(_params) == 1 and _params[0][0] == "KEY":
+        _KEY_CODES.setdefault(_params[0][1], _name)
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Answer ESC/VP.net hello datagrams like projectors do."""
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def datagram_received(self, data, addr):
+        if data[:10] == ESCVPNET_HELLO_COMMAND[:10].encode():
+            self._transport.sendto(HELLO_RESPONSE, addr)
+
+
+class ProjectorSimulator:
+    """
+    In-process simulated Epson projector.
+
+    Every request is answered after latency seconds. After power on or off
+    the projector reports warm-up or cool-down state and rejects other
+    requests with ERR, like real devices. Connections can be dropped at
+    random and replies split into chunks to exercise reconnect and framing.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        serial_number=DEFAULT_SERIAL_NUMBER,
+        state=None,
+        latency=0.0,
+        warmup_time=0.0,
+        cooldown_time=0.0,
+        drop_probability=0.0,
+        chunk_size=None,
+        chunk_delay=0.0,
+        unsupported=(),
+    ):
+        """
+        Init simulator, servers are started with start.
+
+        :param str host:                Address to listen on
+        :param str serial_number:       Serial number reported by projector
+        :param dict state:              Initial property values
+        :param float latency:           Seconds before every reply
+        :param float warmup_time:       Seconds projector is busy after PWR ON
+        :param float cooldown_time:     Seconds projector is busy after PWR OFF
+        :param float drop_probability:  Chance to drop connection instead of reply
+        :param int chunk_size:          Write replies in chunks of this many bytes
+        :param float chunk_delay:       Seconds between chunks of reply
+        :param unsupported:             Properties answered with ERR
+        """
+        self._host = host
+        self.serial_number = serial_number
+        self.state = dict(DEFAULT_STATE if state is None else state)
+        self.latency = latency
+        self.warmup_time = warmup_time
+        self.cooldown_time = cooldown_time
+        self.drop_probability = drop_probability
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.unsupported = set(unsupported)
+        self.request_count = 0
+        self.tcp_port = None
+        self.serial_number_port = None
+        self.http_port = None
+        self.udp_port = None
+        self._servers = []
+        self._udp_transport = None
+        self._writers = set()
+        self._http_runner = None
+        self._ptys = []
+        self._busy_until = 0
+        self._power_target = None
+        self._power_off_pending = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self, tcp_port=0, serial_number_port=0, http_port=0, udp_port=None):
+        """
+        Start servers, port 0 picks a free port, None skips the server.
+
+        UDP discovery responder is not started by default, as projectors
+        share port 3629 for it.
+        """
+        if tcp_port is not None:
+            server = await asyncio.start_server(self._handle_tcp, self._host, tcp_port)
+            self._servers.append(server)
+            self.tcp_port = server.sockets[0].getsockname()[1]
+        if serial_number_port is not None:
+            server = await asyncio.start_server(
+                self._handle_serial_number, self._host, serial_number_port
+            )
+            self._servers.append(server)
+            self.serial_number_port = server.sockets[0].getsockname()[1]
+        if http_port is not None:
+            app = web.Application()
+            app.router.add_get(f"/cgi-bin/{JSON_QUERY}", self._handle_json_query)
+            app.router.add_get(f"/cgi-bin/{DIRECT_SEND}", self._handle_direct_send)
+            self._http_runner = web.AppRunner(app, access_log=None)
+            await self._http_runner.setup()
+            site = web.TCPSite(self._http_runner, self._host, http_port)
+            await site.start()
+            self.http_port = self._http_runner.addresses[0][1]
+        if udp_port is not None:
+            loop = asyncio.get_running_loop()
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                _DiscoveryProtocol, local_addr=(self._host, udp_port)
+            )
+            self.udp_port = self._udp_transport.get_extra_info("sockname")[1]
+
+    async def stop(self):
+        """Stop all servers and close connections."""
+        self.drop_connections()
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._http_runner is not None:
+            await self._http_runner.cleanup()
+            self._http_runner = None
+        for master, slave, task in self._ptys:
+            task.cancel()
+            os.close(master)
+            os.close(slave)
+        self._ptys = []
+
+    def drop_connections(self):
+        """Close all open ESC/VP.net and serial connections."""
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    async def open_pty(self):
+        """Serve ESC/VP21 on a pseudo terminal, return its path for serial."""
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader),
+            os.fdopen(os.dup(master), "rb", buffering=0),
+        )
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin,
+            os.fdopen(os.dup(master), "wb", buffering=0),
+        )
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        task = asyncio.ensure_future(self._serve_escvp21(reader, writer))
+        self._ptys.append((master, slave, task))
+        return os.ttyname(slave)
+
+    def power_state(self):
+        """Return PWR reply, following warm-up and cool-down."""
+        if self._power_target is not None and time.monotonic() >= self._busy_until:
+            self.state[POWER] = self._power_target
+            self._power_target = None
+        return self.state[POWER]
+
+    def is_busy(self):
+        """Return True during warm-up and cool-down."""
+        return self.power_state() in (PWR_WARMUP_STATE, PWR_COOLDOWN_STATE)
+
+    def handle_request(self, request):
+        """
+        Answer one ESC/VP21 request without CR.
+
+        Returns reply without prompt, empty string for accepted commands.
+        """
+        self.request_count += 1
+        if not request:
+            return ""
+        if request.endswith("?"):
+            return self._query(request[:-1])
+        name, _, value = request.partition(" ")
+        if name == POWER:
+            return self._set_power(value == "ON")
+        if name == "KEY" and _KEY_CODES.get(value) == "PWR ON":
+            return self._press_power_key()
+        if self.is_busy() or self.power_state() != PWR_ON_STATE:
+            return ERROR
+        if name == "KEY":
+            return self._press_key(value)
+        if not value or name in self.unsupported:
+            return ERROR
+        self.state[name] = value
+        return ""
+
+    def _query(self, name):
+        if name == POWER:
+            return f"{POWER}={self.power_state()}"
+        if name == SNO:
+            return f"{SNO}={self.serial_number}"
+        if name in self.unsupported or name not in self.state:
+            return ERROR
+        if name not in STANDBY_QUERIES and self.power_state() != PWR_ON_STATE:
+            return ERROR
+        return f"{name}={self.state[name]}"
+
+    def _set_power(self, on):
+        if self.is_busy():
+            return ERROR
+        if on and self.state[POWER] != PWR_ON_STATE:
+            self._start_transition(PWR_WARMUP_STATE, PWR_ON_STATE, self.warmup_time)
+        elif not on and self.state[POWER] == PWR_ON_STATE:
+            self._start_transition(
+                PWR_COOLDOWN_STATE, PWR_OFF_STATE, self.cooldown_time
+            )
+        return ""
+
+    def _start_transition(self, transition_state, target, duration):
+        self.state[POWER] = transition_state
+        self._power_target = target
+        self._busy_until = time.monotonic() + duration
+
+    def _press_key(self, code):
+        command = _KEY_CODES.get(code)
+        if command is None:
+            return ERROR
+        if command in _SOURCE_KEYS:
+            self.state["SOURCE"] = _SOURCE_KEYS[command]
+        elif command in ("VOL_UP", "VOL_DOWN"):
+            step = 1 if command == "VOL_UP" else -1
+            self.state["VOL"] = str(max(0, int(self.state["VOL"]) + step))
+        elif command == "MUTE":
+            self.state["MUTE"] = "OFF" if self.state["MUTE"] == "ON" else "ON"
+        return ""
+
+    def _press_power_key(self):
+        """Power key turns on, or off when pressed second time to confirm."""
+        if self.power_state() != PWR_ON_STATE:
+            return self._set_power(True)
+        if not self._power_off_pending:
+            self._power_off_pending = True
+            return ""
+        self._power_off_pending = False
+        return self._set_power(False)
+
+    async def _reply(self, writer, reply):
+        """Write reply with prompt, in chunks when configured."""
+        data = (reply + CR + ":" if reply else ":").encode()
+        if not self.chunk_size:
+            writer.write(data)
+            return
+        for index in range(0, len(data), self.chunk_size):
+            writer.write(data[index : index + self.chunk_size])
+            await writer.drain()
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+
+    async def _handle_tcp(self, reader, writer):
+        try:
+            hello = await reader.readexactly(len(ESCVPNET_HELLO_COMMAND))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if hello[:10] != ESCVPNET_HELLO_COMMAND[:10].encode():
+            writer.close()
+            return
+        writer.write(HELLO_RESPONSE)
+        await self._serve_escvp21(reader, writer)
+
+    async def _serve_escvp21(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await reader.readuntil(CR.encode())
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.drop_probability and random.random() < self.drop_probability:
+                    _LOGGER.debug("Dropping connection on %r", request)
+                    break
+                await self._reply(writer, self.handle_request(request[:-1].decode()))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle_serial_number(self, reader, writer):
+        try:
+            request = await reader.readexactly(len(SERIAL_BYTE))
+            if request == bytes(SERIAL_BYTE) and self.power_state() == PWR_ON_STATE:
+                writer.write(SERIAL_RESPONSE_HEADER + self.serial_number.encode())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    async def _handle_json_query(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        query = request.query.get("jsoncallback", "")
+        reply = self.handle_request(query)
+        value = reply.partition("=")[2] if reply != ERROR else ERROR
+        return web.json_response({"projector": {"feature": {"reply": value}}})
+
+    async def _handle_direct_send(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for name, value in request.query.items():
+            self.handle_request(f"{name} {value}")
+        return web.Response()
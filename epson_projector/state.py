@@ -0,0 +1,211 @@
+"""
+Decoded state of Epson projector.
+
+Replies like "30" or "0C" are decoded once into enums through indexes
+built at import, so consumers do not look them up in SOURCE_LIST,
+CMODE_LIST and CMODE_LIST_SET again. Names are matched case-insensitively.
+"""
+
+import enum
+
+from .const import (
+    BUSY,
+    CMODE,
+    CMODE_LIST,
+    CMODE_LIST_SET,
+    DEFAULT_SOURCES,
+    EPSON_KEY_COMMANDS,
+    ERROR,
+    POWER,
+    SOURCE,
+    SOURCE_LIST,
+    STATE_UNAVAILABLE,
+    VOLUME,
+)
+
+
+class _CodedEnum(enum.Enum):
+    """Enum of ESC/VP21 codes with lookup by code and by name."""
+
+    @property
+    def code(self):
+        """Return ESC/VP21 code of member."""
+        return self.value
+
+    @property
+    def label(self):
+        """Return human readable name of member."""
+        return _LABELS[type(self)].get(self, self.name)
+
+    @property
+    def command(self):
+        """Return command selecting member, None if there is none."""
+        return _COMMANDS[type(self)].get(self)
+
+    @classmethod
+    def from_code(cls, code):
+        """Return member of ESC/VP21 code, None if code is unknown."""
+        return _CODES[cls].get(code)
+
+    @classmethod
+    def from_name(cls, name):
+        """Return member by name, label or command, ignoring case."""
+        return _NAMES[cls].get(name.casefold())
+
+
+class PowerState(_CodedEnum):
+    """Reply of PWR? query."""
+
+    STANDBY = "00"
+    ON = "01"
+    WARMUP = "02"
+    COOLDOWN = "03"
+    NETWORK_STANDBY = "04"
+    ABNORMAL_STANDBY = "05"
+
+
+class Source(_CodedEnum):
+    """Reply of SOURCE? query."""
+
+    PC = "10"
+    HDMI1 = "30"
+    VIDEO = "40"
+    USB = "52"
+    LAN = "53"
+    WFD = "56"
+    HDMI2 = "A0"
+
+
+ColorMode = _CodedEnum(
+    "ColorMode",
+    [
+        (name[len(CMODE) + 1 :], params[0][1])
+        for name, params in EPSON_KEY_COMMANDS.items()
+        if params[0][0] == CMODE
+    ],
+    module=__name__,
+    qualname="ColorMode",
+)
+ColorMode.__doc__ = "Reply of CMODE? query."
+
+# Codes projectors send for the same source, besides the enum value.
+_EXTRA_SOURCE_CODES = {
+    code: Source.VIDEO for code, name in SOURCE_LIST.items() if name == "VIDEO"
+}
+
+_CODES = {
+    PowerState: {member.value: member for member in PowerState},
+    Source: {**{member.value: member for member in Source}, **_EXTRA_SOURCE_CODES},
+    ColorMode: {member.value: member for member in ColorMode},
+}
+_LABELS = {
+    PowerState: {},
+    Source: {Source[name]: label for name, label in DEFAULT_SOURCES.items()},
+    ColorMode: {ColorMode(code): label for code, label in CMODE_LIST.items()},
+}
+_COMMANDS = {
+    PowerState: {},
+    Source: {member: member.name for member in Source},
+    ColorMode: {member: f"{CMODE}_{member.name}" for member in ColorMode},
+}
+_NAMES = {}
+for _cls in (PowerState, Source, ColorMode):
+    _NAMES[_cls] = {}
+    for _member in _cls:
+        for _name in (_member.name, _member.label, _member.command):
+            if _name:
+                _NAMES[_cls][_name.casefold()] = _member
+for _name, _command in CMODE_LIST_SET.items():
+    _NAMES[ColorMode].setdefault(
+        _name.casefold(), ColorMode[_command[len(CMODE) + 1 :]]
+    )
+
+# Property queried for every field of ProjectorState and enum decoding it.
+STATE_PROPERTIES = {
+    "power": (POWER, PowerState),
+    "source": (SOURCE, Source),
+    "color_mode": (CMODE, ColorMode),
+    "volume": (VOLUME, int),
+}
+
+
+def decode(enum_type, value):
+    """
+    Decode reply into member of enum_type.
+
+    None is returned for missing values, unknown codes are kept as
+    strings so new models do not break decoding.
+    """
+    if value in (None, False, BUSY, ERROR, STATE_UNAVAILABLE, ""):
+        return None
+    if enum_type is int:
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    member = enum_type.from_code(value)
+    return value if member is None else member
+
+
+class ProjectorState:
+    """
+    Immutable snapshot of decoded projector state.
+
+    Fields missing from the snapshot are None. Snapshots compare equal
+    when all fields are equal, and diff returns changed fields only.
+    """
+
+    __slots__ = tuple(STATE_PROPERTIES)
+
+    def __init__(self, power=None, source=None, color_mode=None, volume=None):
+        """Init snapshot from decoded values."""
+        setattr_ = super().__setattr__
+        setattr_("power", power)
+        setattr_("source", source)
+        setattr_("color_mode", color_mode)
+        setattr_("volume", volume)
+
+    @classmethod
+    def from_properties(cls, values):
+        """Decode dict of property to raw reply, as given by get_properties."""
+        return cls(
+            **{
+                field: decode(enum_type, values.get(prop))
+                for field, (prop, enum_type) in STATE_PROPERTIES.items()
+            }
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ProjectorState is immutable")
+
+    def _values(self):
+        return (self.power, self.source, self.color_mode, self.volume)
+
+    def __eq__(self, other):
+        if not isinstance(other, ProjectorState):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self.__slots__
+        )
+        return f"ProjectorState({fields})"
+
+    def diff(self, other):
+        """Return dict of field to (old, new) for fields changed in other."""
+        return {
+            field: (old, new)
+            for field, old, new in zip(self.__slots__, self._values(), other._values())
+            if old != new
+        }
+
+    def as_dict(self):
+        """Return fields as dict of plain values, enums by their name."""
+        return {
+            field: value.name if isinstance(value, enum.Enum) else value
+            for field, value in zip(self.__slots__, self._values())
+        }
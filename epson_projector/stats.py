@@ -0,0 +1,109 @@
+"""Request statistics of Epson projector."""
+
+import bisect
+import logging
+
+from .const import BUSY, ERROR, STATE_UNAVAILABLE
+
+_LOGGER = logging.getLogger(__name__)
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "err"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_BUSY = "busy"
+OUTCOME_UNAVAILABLE = "unavailable"
+
+# Upper bounds in seconds of latency histogram buckets, last one is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def classify(value, failure=None):
+    """
+    Return outcome of request from its result.
+
+    :param value:       Value returned by connection
+    :param str failure: Reason given by connection for missing value
+    """
+    if value is False or value is None:
+        return failure or OUTCOME_ERROR
+    if value == ERROR:
+        return OUTCOME_ERROR
+    if value == BUSY:
+        return OUTCOME_BUSY
+    if value == STATE_UNAVAILABLE:
+        return OUTCOME_UNAVAILABLE
+    return OUTCOME_OK
+
+
+class _Series:
+    """Counter and latency histogram of one transport, command and outcome."""
+
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "buckets": dict(
+                zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.buckets)
+            ),
+        }
+
+
+class RequestStats:
+    """
+    Counters and latency histograms of requests sent to projector.
+
+    Requests are broken down by transport, command and outcome. Hooks get
+    every request as it is recorded, to push it to a metrics system.
+    """
+
+    def __init__(self):
+        """Init empty statistics."""
+        self._series = {}
+        self._hooks = []
+
+    def add_hook(self, hook):
+        """
+        Add callable called with transport, command, outcome and latency.
+
+        Returns function removing the hook.
+        """
+        self._hooks.append(hook)
+        return lambda: self._hooks.remove(hook)
+
+    def record(self, transport, command, outcome, latency):
+        """Record one request."""
+        key = (transport, command, outcome)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        series.count += 1
+        series.total += latency
+        series.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        for hook in self._hooks:
+            try:
+                hook(transport, command, outcome, latency)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in statistics hook")
+
+    def snapshot(self):
+        """Return list of series as dicts."""
+        return [
+            dict(
+                transport=transport,
+                command=command,
+                outcome=outcome,
+                **series.as_dict()
+            )
+            for (transport, command, outcome), series in self._series.items()
+        ]
+
+    def reset(self):
+        """Forget all recorded requests."""
+        self._series = {}
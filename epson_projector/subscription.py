@@ -0,0 +1,158 @@
+"""Subscription to property changes of Epson projector."""
+import logging
+import time
+from collections import namedtuple
+
+import asyncio
+import async_timeout
+
+from .const import (
+    BUSY,
+    POWER,
+    PWR_COOLDOWN_STATE,
+    PWR_OFF_STATE,
+    PWR_STANDBY_STATE,
+    PWR_WARMUP_STATE,
+    STATE_UNAVAILABLE,
+)
+from .error import ProjectorError
+
+_LOGGER = logging.getLogger(__name__)
+
+MIN_INTERVAL = 1
+MAX_INTERVAL = 30
+STANDBY_INTERVAL = 60
+BACKOFF_FACTOR = 2
+
+ChangeEvent = namedtuple("ChangeEvent", ["property", "old", "new", "timestamp"])
+ChangeEvent.__doc__ = "Change of property value, old is None for first value."
+
+_NO_VALUE = (False, None, BUSY, STATE_UNAVAILABLE)
+_END = object()
+
+
+class Subscription:
+    """
+    Async iterator of property changes.
+
+    Properties are polled together and an event is emitted only when value
+    differs from the last one seen. Polling is fast right after a change,
+    during power transitions and after commands, and backs off while values
+    are stable or projector is in standby.
+    """
+
+    def __init__(
+        self,
+        projector,
+        properties,
+        min_interval=MIN_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        standby_interval=STANDBY_INTERVAL,
+    ):
+        """
+        Init subscription, use Projector.subscribe instead.
+
+        :param Projector projector:     Projector to poll
+        :param list properties:         Properties to watch
+        :param float min_interval:      Seconds between polls during transitions
+        :param float max_interval:      Longest seconds between polls when stable
+        :param float standby_interval:  Seconds between polls in standby
+        """
+        self._projector = projector
+        self._properties = list(properties)
+        self._queries = self._properties + (
+            [] if POWER in self._properties else [POWER]
+        )
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._standby_interval = standby_interval
+        self._interval = min_interval
+        self._last = {}
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closed = False
+
+    @property
+    def interval(self):
+        """Return current poll interval."""
+        return self._interval
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._task is None and not self._closed:
+            self._task = asyncio.ensure_future(self._run())
+        if self._closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await self._queue.get()
+        if event is _END:
+            raise StopAsyncIteration
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def kick(self):
+        """Poll fast again, projector is expected to change soon."""
+        self._interval = self._min_interval
+        self._wakeup.set()
+
+    def close(self, error=None):
+        """Stop polling and end iteration, raising error if one is given."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._projector._subscriptions.discard(self)
+        self._queue.put_nowait(_END if error is None else error)
+
+    async def _run(self):
+        while True:
+            # Cleared before polling, so kicks during the poll are kept.
+            self._wakeup.clear()
+            try:
+                values = await self._projector.get_properties(self._queries)
+            except (ProjectorError, OSError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Polling subscription failed: %r", err)
+                values = {}
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception("Subscription stopped by unexpected error")
+                self.close(err)
+                return
+            self._interval = self._next_interval(self._emit(values), values)
+            try:
+                async with async_timeout.timeout(self._interval):
+                    await self._wakeup.wait()
+            except asyncio.TimeoutError:
+                pass
+
+    def _emit(self, values):
+        """Queue events for changed values, return True if any changed."""
+        changed = False
+        timestamp = time.time()
+        for name in self._properties:
+            value = values.get(name)
+            if value in _NO_VALUE:
+                continue
+            old = self._last.get(name)
+            if value != old:
+                self._last[name] = value
+                self._queue.put_nowait(ChangeEvent(name, old, value, timestamp))
+                changed = True
+        return changed
+
+    def _next_interval(self, changed, values):
+        power = values.get(POWER)
+        if changed or power in (PWR_WARMUP_STATE, PWR_COOLDOWN_STATE):
+            return self._min_interval
+        if power in (PWR_STANDBY_STATE, PWR_OFF_STATE):
+            return self._standby_interval
+        return min(self._interval * BACKOFF_FACTOR, self._max_interval)
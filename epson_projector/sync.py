@@ -0,0 +1,204 @@
+"""
+Synchronous facade of Epson projector module.
+
+One event loop runs in a background thread shared by all facades, so
+connections stay open between calls and callers from many threads can
+use the same projectors without starting a loop on every call.
+"""
+
+import asyncio
+import queue
+import threading
+
+from .fleet import ProjectorFleet
+from .projector import Projector
+
+_SWEEP_DONE = object()
+
+
+class _LoopThread:
+    """Event loop running forever in a daemon thread, started on first use."""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        """Return running loop, starting its thread if needed."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                started = threading.Event()
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(self._loop, started),
+                    name="epson-projector-loop",
+                    daemon=True,
+                )
+                thread.start()
+                started.wait()
+            return self._loop
+
+    @staticmethod
+    def _run(loop, started):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule coroutine in the loop, return concurrent.futures.Future."""
+        loop = self.loop
+        if _running_loop() is loop:
+            coro.close()
+            raise RuntimeError("Synchronous facade called from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_loop_thread = _LoopThread()
+
+
+async def _create(factory, *args, **kwargs):
+    """Create object inside the loop, as connections need running loop."""
+    return factory(*args, **kwargs)
+
+
+async def _call(function, *args):
+    """Call plain function inside the loop."""
+    return function(*args)
+
+
+class SyncProjector:
+    """
+    Blocking Projector.
+
+    Takes the same arguments as Projector. Every coroutine method of
+    Projector is available as blocking method returning its result, and
+    submit returns concurrent.futures.Future instead of waiting.
+    """
+
+    _METHODS = (
+        "get_power",
+        "get_property",
+        "get_properties",
+        "get_serial_number",
+        "get_state",
+        "send_command",
+        "send_request",
+        "set_stepped",
+        "set_volume",
+        "discover_capabilities",
+    )
+
+    def __init__(self, *args, **kwargs):
+        """Create Projector in the background loop."""
+        self._projector = _loop_thread.submit(
+            _create(Projector, *args, **kwargs)
+        ).result()
+
+    @property
+    def projector(self):
+        """Return wrapped Projector, use it only inside the background loop."""
+        return self._projector
+
+    @property
+    def host(self):
+        """Return host of projector."""
+        return self._projector.host
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Run coroutine method of Projector, return concurrent.futures.Future.
+
+        :param str method:  Name of method, like "get_property"
+        """
+        if method not in self._METHODS:
+            raise AttributeError(f"Projector has no coroutine method {method}")
+        return _loop_thread.submit(getattr(self._projector, method)(*args, **kwargs))
+
+    def __getattr__(self, name):
+        if name in self._METHODS:
+            return lambda *args, **kwargs: self.submit(name, *args, **kwargs).result()
+        raise AttributeError(name)
+
+    def stats(self):
+        """Return snapshot of request statistics."""
+        return _loop_thread.submit(_call(self._projector.stats)).result()
+
+    def close(self):
+        """Close connection to projector."""
+        _loop_thread.submit(_call(self._projector.close)).result()
+
+
+class SyncFleet:
+    """
+    Blocking ProjectorFleet.
+
+    Takes SyncProjector objects instead of Projector, other arguments are
+    the same as of ProjectorFleet.
+    """
+
+    def __init__(self, projectors, properties, **kwargs):
+        """Create ProjectorFleet in the background loop."""
+        self._fleet = _loop_thread.submit(
+            _create(
+                ProjectorFleet,
+                [projector.projector for projector in projectors],
+                properties,
+                **kwargs,
+            )
+        ).result()
+
+    @classmethod
+    def from_hosts(cls, hosts, properties, **kwargs):
+        """Create fleet from (host, type) pairs."""
+        fleet = cls.__new__(cls)
+        fleet._fleet = _loop_thread.submit(
+            _create(ProjectorFleet.from_hosts, hosts, properties, **kwargs)
+        ).result()
+        return fleet
+
+    @property
+    def fleet(self):
+        """Return wrapped ProjectorFleet, use it only inside the background loop."""
+        return self._fleet
+
+    def submit_sweep(self):
+        """Poll every projector once, return Future of list of FleetResult."""
+        return _loop_thread.submit(self._collect())
+
+    def sweep(self):
+        """Poll every projector once, return list of FleetResult."""
+        return self.submit_sweep().result()
+
+    def iter_sweep(self):
+        """Poll every projector once, yield FleetResult as they complete."""
+        results = queue.Queue()
+        future = _loop_thread.submit(self._forward(results))
+        while True:
+            result = results.get()
+            if result is _SWEEP_DONE:
+                break
+            yield result
+        future.result()
+
+    def close(self):
+        """Close connections to all projectors."""
+        _loop_thread.submit(_call(self._fleet.close)).result()
+
+    async def _collect(self):
+        return [result async for result in self._fleet.sweep()]
+
+    async def _forward(self, results):
+        try:
+            async for result in self._fleet.sweep():
+                results.put(result)
+        finally:
+            results.put(_SWEEP_DONE)
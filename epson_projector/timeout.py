@@ -1,4 +1,108 @@
-from .const import TIMEOUT_TIMES, DEFAULT_TIMEOUT_TIME
+"""Timeouts of requests to Epson projector."""
+from .commands import COMMANDS, get_command
+from .stats import OUTCOME_BUSY, OUTCOME_ERROR, OUTCOME_OK, OUTCOME_TIMEOUT
+
+# Smoothing gains and variance factor of RFC 6298 retransmission timeout.
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+MIN_TIMEOUT = 0.5
+QUERY_CLASS = "query"
+
+# Outcomes which mean the projector answered, so latency is a sample.
+_ANSWERED = (OUTCOME_OK, OUTCOME_ERROR, OUTCOME_BUSY)
+
 
 def get_timeout(command, timeout_scale=1):
-    return TIMEOUT_TIMES.get(command, DEFAULT_TIMEOUT_TIME) * timeout_scale
+    return get_command(command).timeout * timeout_scale
+
+
+def command_class(command):
+    """Return class of command sharing one latency estimate."""
+    return QUERY_CLASS if command.is_query else command.lock_category
+
+
+class _Estimate:
+    """Smoothed round trip time and its variance of one command class."""
+
+    __slots__ = ("srtt", "rttvar", "rto")
+
+    def __init__(self, rtt):
+        self.srtt = rtt
+        self.rttvar = rtt / 2
+        self.rto = self.srtt + RTT_K * self.rttvar
+
+    def sample(self, rtt):
+        self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+        self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self.rto = self.srtt + RTT_K * self.rttvar
+
+
+class AdaptiveTimeout:
+    """
+    Timeouts learned from observed latency, like TCP retransmission timeout.
+
+    Latency of answered requests updates smoothed round trip time and its
+    variance per command class, timeout is their sum with variance taken
+    RTT_K times. Static TIMEOUT_TIMES are upper bounds and are used until
+    first answer. Every timeout doubles the learned one, so a projector
+    which got slower is not declared dead on every request.
+    """
+
+    def __init__(self, min_timeout=MIN_TIMEOUT):
+        """
+        Init without estimates.
+
+        :param float min_timeout:   Lower bound of learned timeouts in seconds
+        """
+        self._min_timeout = min_timeout
+        self._estimates = {}
+
+    def get(self, command, timeout_scale=1):
+        """Return timeout of command in seconds."""
+        upper = get_timeout(command, timeout_scale)
+        estimate = self._estimates.get(command_class(get_command(command)))
+        if estimate is None:
+            return upper
+        return min(upper, max(self._min_timeout, estimate.rto))
+
+    def observe(self, transport, command, outcome, latency):
+        """Update estimate with recorded request, usable as statistics hook."""
+        self.observe_batch({command: outcome}, latency)
+
+    def observe_batch(self, outcomes, latency, replies=None):
+        """
+        Update estimates with one request carrying several commands.
+
+        Projector answers them one after another and timeouts apply to
+        each reply, so latency divided by number of replies is one sample
+        of every command class in the batch, and a timeout doubles timeout
+        of a class once.
+
+        :param dict outcomes:   Command to outcome
+        :param float latency:   Seconds the whole request took
+        :param int replies:     Number of replies, default number of commands
+        """
+        per_reply = latency / (replies or len(outcomes))
+        classes = {}
+        for command, outcome in outcomes.items():
+            compiled = COMMANDS.get(command)
+            if compiled is not None:
+                classes.setdefault(command_class(compiled), set()).add(outcome)
+        for key, seen in classes.items():
+            estimate = self._estimates.get(key)
+            if OUTCOME_TIMEOUT in seen:
+                if estimate is not None:
+                    estimate.rto *= 2
+            elif not seen.isdisjoint(_ANSWERED):
+                if estimate is None:
+                    self._estimates[key] = _Estimate(per_reply)
+                else:
+                    estimate.sample(per_reply)
+
+    def estimates(self):
+        """Return dict of command class to srtt, rttvar and timeout."""
+        return {
+            key: {"srtt": est.srtt, "rttvar": est.rttvar, "timeout": est.rto}
+            for key, est in self._estimates.items()
+        }
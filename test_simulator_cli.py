@@ -0,0 +1,71 @@
+"""Tests of the command line tool against the projector simulator."""
+import asyncio
+import io
+import json
+import socket
+
+import pytest
+
+from epson_projector.__main__ import parse_args, read_inventory, run
+from epson_projector.const import HTTP, SERIAL, TCP
+from epson_projector.simulator import ProjectorSimulator
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_read_inventory():
+    lines = [
+        "# rooms",
+        "10.0.0.5",
+        "10.0.0.6 http 8080  # lobby",
+        "",
+        "/dev/ttyUSB0 serial",
+    ]
+    assert read_inventory(lines) == [
+        ("10.0.0.5", TCP, None),
+        ("10.0.0.6", HTTP, 8080),
+        ("/dev/ttyUSB0", SERIAL, None),
+    ]
+    assert read_inventory(["10.0.0.5"], HTTP) == [("10.0.0.5", HTTP, None)]
+    with pytest.raises(ValueError):
+        read_inventory(["10.0.0.5 telnet"])
+
+
+def _run(tmp_path, inventory, *argv):
+    path = tmp_path / "rooms.txt"
+    path.write_text("\n".join(inventory) + "\n")
+    output = io.StringIO()
+    failures = asyncio.run(
+        run(parse_args([str(path), "--timeout", "1", *argv]), output=output)
+    )
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    return failures, sorted(records, key=lambda record: "error" in record)
+
+
+def _serve(test):
+    async def run_test():
+        async with ProjectorSimulator() as sim:
+            await asyncio.get_running_loop().run_in_executor(None, test, sim)
+
+    asyncio.run(run_test())
+
+
+def test_get_and_send_across_projectors(tmp_path):
+    def test(sim):
+        inventory = [
+            f"127.0.0.1 tcp {sim.tcp_port}",
+            f"127.0.0.1 tcp {_closed_port()}",
+        ]
+        failures, records = _run(tmp_path, inventory, "get", "PWR", "SOURCE")
+        assert failures == 1
+        assert records[0]["result"] == {"PWR": "01", "SOURCE": "30"}
+        assert "error" in records[1]
+        failures, records = _run(tmp_path, inventory[:1], "send", "HDMI2")
+        assert (failures, records[0]["result"]) == (0, "HDMI2")
+        assert sim.state["SOURCE"] == "A0"
+
+    _serve(test)
@@ -0,0 +1,46 @@
+"""Tests of projector discovery against the projector simulator."""
+import asyncio
+import socket
+
+from epson_projector.const import TCP
+from epson_projector.discovery import DiscoveredProjector, discover
+from epson_projector.simulator import DEFAULT_SERIAL_NUMBER, ProjectorSimulator
+
+NETWORK = "127.0.0.1/32"
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _discover(tcp=True, udp=True):
+    async def run():
+        sim = ProjectorSimulator()
+        await sim.start(udp_port=0)
+        try:
+            return await discover(
+                NETWORK,
+                port=sim.tcp_port if tcp else _closed_port(),
+                udp_port=sim.udp_port if udp else None,
+                timeout=0.2,
+            )
+        finally:
+            await sim.stop()
+
+    return asyncio.run(run())
+
+
+def test_tcp_probe_finds_serial_number():
+    assert _discover(udp=False) == [
+        DiscoveredProjector("127.0.0.1", TCP, DEFAULT_SERIAL_NUMBER)
+    ]
+
+
+def test_broadcast_answer_is_found_without_serial_number():
+    assert _discover(tcp=False) == [DiscoveredProjector("127.0.0.1", TCP, None)]
+
+
+def test_nothing_found():
+    assert _discover(tcp=False, udp=False) == []
@@ -0,0 +1,73 @@
+"""Tests of polling fleets of projectors with simulators."""
+import asyncio
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.fleet import ProjectorFleet
+from epson_projector.simulator import ProjectorSimulator
+
+PROPERTIES = ["PWR", "SOURCE"]
+
+
+def test_sweep_yields_one_result_per_projector():
+    async def run():
+        async with ProjectorSimulator() as first, ProjectorSimulator(
+            unsupported=["SOURCE"]
+        ) as second:
+            fleet = ProjectorFleet(
+                [
+                    epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+                    for sim in (first, second)
+                ],
+                PROPERTIES,
+                concurrency=1,
+            )
+            try:
+                results = [result async for result in fleet.sweep()]
+            finally:
+                fleet.close()
+            assert [result.error for result in results] == [None, None]
+            values = {result.values["SOURCE"] for result in results}
+            assert values == {False, "30"}
+
+    asyncio.run(run())
+
+
+def test_sweep_reports_timeout():
+    async def run():
+        async with ProjectorSimulator(latency=0.5) as sim:
+            projector = epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+            fleet = ProjectorFleet([projector], PROPERTIES, timeout=0.1)
+            try:
+                results = [result async for result in fleet.sweep()]
+            finally:
+                fleet.close()
+            assert results[0].error == "timeout"
+            assert results[0].values == {}
+
+    asyncio.run(run())
+
+
+def test_unexpected_error_does_not_hang_sweep():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            broken = epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+            working = epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+
+            async def get_properties(*args, **kwargs):
+                raise RuntimeError("bug")
+
+            broken.get_properties = get_properties
+            fleet = ProjectorFleet([broken, working], PROPERTIES)
+            try:
+                results = await asyncio.wait_for(_collect(fleet.sweep()), 2)
+            finally:
+                fleet.close()
+            errors = sorted(str(result.error) for result in results)
+            assert errors == ["None", "RuntimeError"]
+
+    asyncio.run(run())
+
+
+async def _collect(results):
+    return [result async for result in results]
@@ -0,0 +1,133 @@
+"""Tests of ESC/VP21 framing and pipelining against the projector simulator."""
+import asyncio
+import time
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.framer import ResponseFramer
+from epson_projector.simulator import ProjectorSimulator
+
+BATCH = ["PWR", "CMODE", "VOLUME", "LUMINANCE", "LAMP", "HDMILINK"]
+
+
+def _tcp(sim, **kwargs):
+    return epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port, **kwargs)
+
+
+def test_framer_skips_stale_reply():
+    framer = ResponseFramer()
+    framer.resync()
+    framer.feed(b"ERR\r:\r:")
+    assert framer.accept(framer.next_frame(), None) is False
+    assert framer.accept(framer.next_frame(), None) is True
+
+
+def test_framer_joins_split_reply():
+    framer = ResponseFramer()
+    framer.feed(b"PWR=0")
+    assert framer.next_frame() is None
+    framer.feed(b"1\r:")
+    frame = framer.next_frame()
+    assert frame == b"PWR=01"
+    assert framer.accept(frame, b"PWR=")
+
+
+def test_late_reply_after_timeout_is_not_taken_for_next_answer():
+    async def run():
+        async with ProjectorSimulator(latency=0.3, unsupported=["LUMINANCE"]) as sim:
+            projector = _tcp(sim)
+            try:
+                assert await projector.get_property("PWR") == "01"
+                assert await projector.get_property("LUMINANCE", timeout=0.1) is False
+                sim.latency = 0
+                # Late ERR of LUMINANCE arrives first and must be skipped.
+                assert await projector.send_command("HDMI2") == ""
+                assert await projector.get_property("SOURCE") == "A0"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_late_replies_of_timed_out_batch_are_all_skipped():
+    async def run():
+        async with ProjectorSimulator(latency=0.05, unsupported=["LUMINANCE"]) as sim:
+            projector = _tcp(sim)
+            try:
+                assert await projector.get_property("PWR") == "01"
+                batch = BATCH + ["SOURCE", "IMGPROC"]
+                values = await projector.get_properties(batch, timeout=0.01)
+                assert not any(values.values())
+                sim.latency = 0
+                assert await projector.get_property("PWR") == "01"
+                assert await projector.send_command("HDMI2") == ""
+                assert sim.state["SOURCE"] == "A0"
+                assert await projector.send_command("CMODE_AUTO") == ""
+                assert await projector.get_property("LAMP") == "1234"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_reply_of_cancelled_request_is_skipped():
+    async def run():
+        async with ProjectorSimulator(latency=0.3, unsupported=["LUMINANCE"]) as sim:
+            projector = _tcp(sim)
+            try:
+                assert await projector.get_property("PWR") == "01"
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(projector.get_properties(["LUMINANCE"]), 0.1)
+                sim.latency = 0
+                assert await projector.send_command("HDMI2") == ""
+                assert await projector.get_property("SOURCE") == "A0"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_pipelined_batch_is_one_round_trip():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                await projector.get_property("PWR")
+                count = sim.request_count
+                values = await projector.get_properties(BATCH)
+                assert all(value is not False for value in values.values())
+                assert sim.request_count - count == len(BATCH)
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_pipelined_batch_timeout_applies_per_reply():
+    async def run():
+        async with ProjectorSimulator(latency=0.3) as sim:
+            projector = _tcp(sim)
+            try:
+                start = time.monotonic()
+                values = await projector.get_properties(BATCH, timeout=0.5)
+                assert time.monotonic() - start > 0.5
+                assert all(value is not False for value in values.values())
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_chunked_replies():
+    async def run():
+        async with ProjectorSimulator(chunk_size=1) as sim:
+            projector = _tcp(sim)
+            try:
+                values = await projector.get_properties(["PWR", "SOURCE", "LAMP"])
+                assert values == {"PWR": "01", "SOURCE": "30", "LAMP": "1234"}
+            finally:
+                projector.close()
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""Tests of ESC/VP.net and JSON gateway against the projector simulator."""
+import asyncio
+import json
+
+from epson_projector.commands import COMMANDS
+from epson_projector.const import ESCVPNET_HELLO_COMMAND
+from epson_projector.gateway import HELLO_RESPONSE, ProjectorGateway
+from epson_projector.simulator import ProjectorSimulator
+
+
+async def _escvpnet_client(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(ESCVPNET_HELLO_COMMAND.encode())
+    assert await reader.readexactly(len(HELLO_RESPONSE)) == HELLO_RESPONSE
+    return reader, writer
+
+
+async def _ask(reader, writer, request):
+    writer.write(request.encode() + b"\r")
+    return (await reader.readuntil(b":")).decode()
+
+
+def test_hello_and_query():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            gateway = ProjectorGateway()
+            try:
+                port = await gateway.add_projector("127.0.0.1", port=sim.tcp_port)
+                reader, writer = await _escvpnet_client(port)
+                assert await _ask(reader, writer, "PWR?") == "PWR=01\r:"
+                assert await _ask(reader, writer, "KEY 40") == ":"
+                assert sim.state["SOURCE"] == "A0"
+                writer.close()
+            finally:
+                await gateway.close()
+
+    asyncio.run(run())
+
+
+def test_unknown_requests_are_rejected_and_not_compiled():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            gateway = ProjectorGateway()
+            try:
+                port = await gateway.add_projector("127.0.0.1", port=sim.tcp_port)
+                json_port = await gateway.start_json()
+                reader, writer = await _escvpnet_client(port)
+                count = len(COMMANDS)
+                assert await _ask(reader, writer, "BOGUS1?") == "ERR\r:"
+                assert await _ask(reader, writer, "BOGUS2 01") == "ERR\r:"
+                assert await _ask(reader, writer, "VOL 100000") == "ERR\r:"
+                writer.close()
+
+                reader, writer = await asyncio.open_connection("127.0.0.1", json_port)
+                request = {"host": "127.0.0.1", "get": ["PWR", "BOGUS3"]}
+                writer.write(json.dumps(request).encode() + b"\n")
+                reply = json.loads(await reader.readline())
+                assert reply["values"] == {"PWR": "01", "BOGUS3": False}
+                writer.write(b'{"host": "127.0.0.1", "send": "BOGUS4"}\n')
+                assert "error" in json.loads(await reader.readline())
+                writer.close()
+                assert len(COMMANDS) == count
+            finally:
+                await gateway.close()
+
+    asyncio.run(run())
+
+
+def test_close_disconnects_clients():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            gateway = ProjectorGateway()
+            port = await gateway.add_projector("127.0.0.1", port=sim.tcp_port)
+            json_port = await gateway.start_json()
+            reader, writer = await _escvpnet_client(port)
+            json_reader, json_writer = await asyncio.open_connection(
+                "127.0.0.1", json_port
+            )
+            await asyncio.sleep(0.05)
+            await asyncio.wait_for(gateway.close(), 1)
+            assert await asyncio.wait_for(reader.read(), 1) == b""
+            assert await asyncio.wait_for(json_reader.read(), 1) == b""
+            writer.close()
+            json_writer.close()
+
+    asyncio.run(run())
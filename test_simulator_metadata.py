@@ -0,0 +1,65 @@
+"""Tests of persistent projector metadata, also kept by the projector simulator."""
+import asyncio
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.metadata import CAPABILITIES, SERIAL, STATE, MetadataStore
+from epson_projector.simulator import DEFAULT_SERIAL_NUMBER, ProjectorSimulator
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "projectors.json")
+    store = MetadataStore(path).load()
+    assert store.hosts() == []
+    store.update("10.0.0.5", serial="X1", model="EH-TW7000")
+    store.update_state("10.0.0.5", {"PWR": "01", "SOURCE": False})
+    store.update_state("10.0.0.5", {"VOLUME": "10"})
+    store.save()
+    record = MetadataStore(path).load().get("10.0.0.5")
+    assert record["model"] == "EH-TW7000"
+    assert record[STATE] == {"PWR": "01", "VOLUME": "10"}
+
+
+def test_broken_or_other_version_file_is_empty_store(tmp_path):
+    path = tmp_path / "projectors.json"
+    path.write_text("{broken")
+    assert MetadataStore(str(path)).load().hosts() == []
+    path.write_text('{"version": 99, "devices": {"10.0.0.5": {}}}')
+    assert MetadataStore(str(path)).load().hosts() == []
+
+
+def test_projector_keeps_serial_state_and_capabilities(tmp_path):
+    async def run():
+        async with ProjectorSimulator(unsupported=["LUMINANCE"]) as sim:
+            store = MetadataStore(str(tmp_path / "projectors.json")).load()
+            projector = epson.Projector(
+                "127.0.0.1",
+                type=TCP,
+                port=sim.tcp_port,
+                serial_port=sim.serial_number_port,
+                metadata=store,
+            )
+            try:
+                await projector.discover_capabilities()
+                await projector.get_property("SOURCE")
+            finally:
+                projector.close()
+            store.save()
+
+            store = MetadataStore(store.path).load()
+            record = store.get("127.0.0.1")
+            assert record[SERIAL] == DEFAULT_SERIAL_NUMBER
+            assert record[CAPABILITIES]["LUMINANCE"] is False
+            assert record[STATE]["SOURCE"] == "30"
+            projector = epson.Projector(
+                "127.0.0.1", type=TCP, port=sim.tcp_port, metadata=store
+            )
+            try:
+                count = sim.request_count
+                assert await projector.get_serial_number() == DEFAULT_SERIAL_NUMBER
+                assert await projector.get_property("LUMINANCE") is False
+                assert sim.request_count == count
+            finally:
+                projector.close()
+
+    asyncio.run(run())
@@ -0,0 +1,90 @@
+"""Tests of recording traffic with the projector simulator and replaying it."""
+import asyncio
+import time
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import HTTP, REPLAY, TCP
+from epson_projector.error import ProjectorUnavailableError
+from epson_projector.recording import ProjectorReplay, read_recording
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.stats import OUTCOME_UNAVAILABLE
+
+
+async def _session(projector):
+    """Requests recorded from simulator and replayed, return their results."""
+    return [
+        await projector.get_properties(["PWR", "SOURCE", "LUMINANCE"]),
+        await projector.send_command("HDMI2"),
+        await projector.get_property("SOURCE"),
+    ]
+
+
+def test_recording_replays_same_results(tmp_path):
+    path = str(tmp_path / "projector.jsonl")
+
+    async def record():
+        async with ProjectorSimulator(unsupported=["LUMINANCE"]) as sim:
+            projector = epson.Projector(
+                "127.0.0.1", type=TCP, port=sim.tcp_port, record=path
+            )
+            try:
+                return await _session(projector)
+            finally:
+                projector.close()
+
+    async def replay():
+        projector = epson.Projector(path, type=REPLAY, replay_speed=0)
+        try:
+            return await _session(projector), projector.stats()
+        finally:
+            projector.close()
+
+    recorded = asyncio.run(record())
+    assert recorded[0] == {"PWR": "01", "SOURCE": "30", "LUMINANCE": False}
+    ((header, exchanges),) = read_recording(path)
+    assert header["type"] == TCP
+    # Readiness probe after HDMI2 is recorded too.
+    methods = [exchange[2] for exchange in exchanges]
+    assert methods[:2] == ["get_properties", "send_command"]
+    assert set(methods[2:]) == {"get_property"}
+    replayed, stats = asyncio.run(replay())
+    assert replayed == recorded
+    assert stats["requests"]
+
+
+def test_replay_keeps_timing_and_timeouts(tmp_path):
+    path = str(tmp_path / "projector.jsonl")
+
+    async def record():
+        async with ProjectorSimulator(latency=0.2) as sim:
+            projector = epson.Projector(
+                "127.0.0.1", type=HTTP, port=sim.http_port, record=path
+            )
+            try:
+                assert await projector.get_property("PWR") == "01"
+                assert await projector.get_property("SOURCE") == "30"
+            finally:
+                projector.close()
+
+    async def replay():
+        replay = ProjectorReplay(path, speed=2)
+        start = time.monotonic()
+        assert await replay.get_property("PWR", 5) == "01"
+        assert 0.08 < time.monotonic() - start < 0.5
+        projector = epson.Projector(path, type=REPLAY, replay_speed=0)
+        try:
+            with pytest.raises(ProjectorUnavailableError):
+                await projector.get_property("PWR", timeout=0.05)
+            # Missing from recording, so no reply at all.
+            assert await projector.get_property("LAMP") is False
+        finally:
+            projector.close()
+        return replay.remaining(), projector.stats()["requests"]
+
+    asyncio.run(record())
+    remaining, requests = asyncio.run(replay())
+    assert remaining == 1
+    outcomes = {(series["command"], series["outcome"]) for series in requests}
+    assert {("PWR", OUTCOME_UNAVAILABLE), ("LAMP", OUTCOME_UNAVAILABLE)} <= outcomes
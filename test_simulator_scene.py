@@ -0,0 +1,74 @@
+"""Tests of scenes against the projector simulator."""
+import asyncio
+import time
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.scene import Scene
+from epson_projector.simulator import ProjectorSimulator
+
+STEPS = ["PWR ON", "HDMI2", "CMODE_DYNAMIC"]
+
+
+def _tcp(sim):
+    return epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+
+
+def test_unknown_step_is_refused():
+    with pytest.raises(ValueError):
+        Scene(["PWR ON", "NO_SUCH_COMMAND"])
+
+
+def test_steps_in_target_state_are_skipped():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                scene = Scene(STEPS)
+                result = await scene.run(projector)
+                assert result.error is None
+                assert result.skipped == ["PWR ON"]
+                assert result.executed == ["HDMI2", "CMODE_DYNAMIC"]
+                assert (sim.state["SOURCE"], sim.state["CMODE"]) == ("A0", "06")
+                result = await scene.run(projector)
+                assert (result.executed, result.skipped) == ([], STEPS)
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_scene_from_standby_ends_busy_windows_early():
+    async def run():
+        async with ProjectorSimulator(warmup_time=0.3) as sim:
+            sim.state["PWR"] = "04"
+            projector = _tcp(sim)
+            try:
+                start = time.monotonic()
+                result = await Scene(STEPS).run(projector)
+                assert result.error is None
+                assert result.executed == STEPS
+                assert time.monotonic() - start < 5
+                assert sim.state["SOURCE"] == "A0"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_run_many_yields_result_per_projector():
+    async def run():
+        async with ProjectorSimulator() as first, ProjectorSimulator() as second:
+            projectors = [_tcp(first), _tcp(second)]
+            try:
+                results = [
+                    result async for result in Scene(["HDMI2"]).run_many(projectors)
+                ]
+                assert [result.executed for result in results] == [["HDMI2"]] * 2
+            finally:
+                for projector in projectors:
+                    projector.close()
+
+    asyncio.run(run())
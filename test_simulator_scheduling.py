@@ -0,0 +1,181 @@
+"""Tests of locks, scheduler, cache and capabilities with the simulator."""
+import asyncio
+import time
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.commands import get_command
+from epson_projector.const import BUSY, TCP
+from epson_projector.lock import Lock
+from epson_projector.scheduler import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    PRIORITY_POWER,
+    CommandScheduler,
+)
+from epson_projector.simulator import ProjectorSimulator
+
+
+def _tcp(sim, **kwargs):
+    return epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port, **kwargs)
+
+
+def test_source_lock_holds_only_source():
+    lock = Lock()
+    lock.setLock("HDMI2")
+    assert lock.remaining("SOURCE") > 0
+    assert lock.remaining("VOLUME") == 0
+    assert lock.remaining("CMODE") == 0
+    lock.release(get_command("HDMI2").lock_category)
+    assert lock.remaining("SOURCE") == 0
+
+
+def test_power_lock_lets_power_safe_queries_through():
+    lock = Lock()
+    lock.setLock("PWR ON")
+    assert lock.remaining("PWR") == 0
+    assert lock.remaining("LAMP") == 0
+    assert lock.remaining("SOURCE") > 0
+    assert lock.remaining("HDMI1") > 0
+
+
+def test_scheduler_serves_by_priority():
+    async def run():
+        scheduler = CommandScheduler(Lock())
+        order = []
+        await scheduler.acquire(PRIORITY_POLL)
+
+        async def request(priority, name):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        tasks = [
+            asyncio.ensure_future(request(PRIORITY_POLL, "poll")),
+            asyncio.ensure_future(request(PRIORITY_COMMAND, "command")),
+            asyncio.ensure_future(request(PRIORITY_POWER, "power")),
+        ]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        assert order == ["power", "command", "poll"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def run():
+        scheduler = CommandScheduler(Lock())
+        await scheduler.acquire(PRIORITY_POLL)
+        waiter = asyncio.ensure_future(scheduler.acquire(PRIORITY_COMMAND))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire(PRIORITY_POLL), 1)
+
+    asyncio.run(run())
+
+
+def test_unrelated_query_is_not_held_by_source_change():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                await projector.send_command("HDMI2")
+                start = time.monotonic()
+                assert await projector.get_property("VOLUME") == "10"
+                assert time.monotonic() - start < 0.5
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_poll_is_not_held_back_by_locked_property():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                await projector.send_command("VOL_UP")
+                start = time.monotonic()
+                values = await projector.get_properties(["SOURCE", "VOLUME"])
+                assert values == {"SOURCE": "30", "VOLUME": BUSY}
+                state = await projector.get_state()
+                assert time.monotonic() - start < 0.5
+                assert state.source is epson.Source.HDMI1
+                assert state.volume is None
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_readiness_probe_ends_busy_window_early():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                await projector.send_command("HDMI2")
+                start = time.monotonic()
+                assert await projector.get_property("SOURCE") == "A0"
+                # SOURCE window is 5 seconds, probe confirms change sooner.
+                assert time.monotonic() - start < 2
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_stepped_setter_does_not_wait_out_busy_window():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                start = time.monotonic()
+                assert await projector.set_volume(15)
+                assert time.monotonic() - start < 1
+                assert sim.state["VOL"] == "15"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_cache_is_invalidated_by_command():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim, cache_ttl=60)
+            try:
+                assert await projector.get_property("SOURCE") == "30"
+                count = sim.request_count
+                assert await projector.get_property("SOURCE") == "30"
+                assert sim.request_count == count
+                await projector.send_command("HDMI2")
+                assert await projector.get_property("SOURCE") == "A0"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_unsupported_capability_is_not_queried_again():
+    async def run():
+        async with ProjectorSimulator(unsupported=["LUMINANCE"]) as sim:
+            projector = _tcp(sim, serial_port=sim.serial_number_port)
+            try:
+                capabilities = await projector.discover_capabilities()
+                assert capabilities["LUMINANCE"] is False
+                assert capabilities["CMODE"] is True
+                count = sim.request_count
+                assert await projector.get_property("LUMINANCE") is False
+                values = await projector.get_properties(["LUMINANCE", "PWR"])
+                assert values == {"LUMINANCE": False, "PWR": "01"}
+                assert sim.request_count == count + 1
+            finally:
+                projector.close()
+
+    asyncio.run(run())
@@ -0,0 +1,60 @@
+"""Tests of decoded projector state, also read from the projector simulator."""
+import asyncio
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import BUSY, ERROR, TCP
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.state import (
+    ColorMode,
+    PowerState,
+    ProjectorState,
+    Source,
+    decode,
+)
+
+
+def test_codes_and_names_decode_to_members():
+    assert Source.from_code("A0") is Source.HDMI2
+    assert Source.from_name("hdmi2") is Source.HDMI2
+    assert Source.HDMI2.command == "HDMI2"
+    assert ColorMode.from_code("15") is ColorMode.CINEMA
+    assert ColorMode.from_name("cmode_cinema") is ColorMode.CINEMA
+    assert PowerState.from_code("04") is PowerState.NETWORK_STANDBY
+    assert PowerState.ON.command is None
+
+
+def test_unknown_and_missing_values():
+    assert decode(Source, "FF") == "FF"
+    for value in (None, False, BUSY, ERROR, ""):
+        assert decode(Source, value) is None
+    assert decode(int, "x") is None
+    assert decode(int, "12") == 12
+
+
+def test_snapshot_is_immutable_and_diffs():
+    old = ProjectorState.from_properties({"PWR": "01", "SOURCE": "30"})
+    new = ProjectorState.from_properties({"PWR": "01", "SOURCE": "A0"})
+    assert old.diff(new) == {"source": (Source.HDMI1, Source.HDMI2)}
+    assert old != new
+    assert old == ProjectorState(power=PowerState.ON, source=Source.HDMI1)
+    assert old.as_dict()["source"] == "HDMI1"
+    with pytest.raises(AttributeError):
+        old.volume = 3
+
+
+def test_get_state_from_simulator():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+            try:
+                state = await projector.get_state()
+                assert state.power is PowerState.ON
+                assert state.source is Source.HDMI1
+                assert state.color_mode is ColorMode.CINEMA
+                assert state.volume == 10
+            finally:
+                projector.close()
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+"""Tests of request statistics with the projector simulator."""
+import asyncio
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.stats import (
+    LATENCY_BUCKETS,
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_TIMEOUT,
+    RequestStats,
+)
+
+
+def _tcp(sim, **kwargs):
+    return epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port, **kwargs)
+
+
+def _counts(projector):
+    return {
+        (series["command"], series["outcome"]): series["count"]
+        for series in projector.stats()["requests"]
+    }
+
+
+def test_histogram_buckets_latency():
+    stats = RequestStats()
+    stats.record(TCP, "PWR", OUTCOME_OK, 0.003)
+    stats.record(TCP, "PWR", OUTCOME_OK, 100)
+    (series,) = stats.snapshot()
+    assert series["count"] == 2
+    assert series["buckets"][str(LATENCY_BUCKETS[0])] == 1
+    assert series["buckets"]["+Inf"] == 1
+    stats.reset()
+    assert stats.snapshot() == []
+
+
+def test_requests_are_counted_by_outcome():
+    async def run():
+        async with ProjectorSimulator(unsupported=["LUMINANCE"]) as sim:
+            projector = _tcp(sim)
+            try:
+                await projector.get_properties(["PWR", "SOURCE", "LUMINANCE"])
+                await projector.get_property("PWR")
+                counts = _counts(projector)
+                assert counts[("PWR", OUTCOME_OK)] == 2
+                assert counts[("SOURCE", OUTCOME_OK)] == 1
+                assert counts[("LUMINANCE", OUTCOME_ERROR)] == 1
+                sim.latency = 0.3
+                await projector.get_property("LAMP", timeout=0.05)
+                assert _counts(projector)[("LAMP", OUTCOME_TIMEOUT)] == 1
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_hooks_get_every_request_and_can_fail():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            seen = []
+
+            def broken_hook(*args):
+                raise RuntimeError("bug")
+
+            projector.add_stats_hook(broken_hook)
+            remove = projector.add_stats_hook(
+                lambda transport, command, outcome, latency: seen.append(
+                    (transport, command, outcome)
+                )
+            )
+            try:
+                assert await projector.get_property("PWR") == "01"
+                remove()
+                assert await projector.get_property("PWR") == "01"
+                assert seen == [(TCP, "PWR", OUTCOME_OK)]
+            finally:
+                projector.close()
+
+    asyncio.run(run())
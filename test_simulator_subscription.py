@@ -0,0 +1,123 @@
+"""Tests of subscriptions to property changes with the projector simulator."""
+import asyncio
+import time
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.simulator import ProjectorSimulator
+
+
+def _tcp(sim, **kwargs):
+    return epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port, **kwargs)
+
+
+def test_changes_are_emitted_once():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            try:
+                async with projector.subscribe(["SOURCE"], min_interval=0.05) as sub:
+                    event = await asyncio.wait_for(sub.__anext__(), 1)
+                    assert (event.property, event.old, event.new) == (
+                        "SOURCE",
+                        None,
+                        "30",
+                    )
+                    sim.state["SOURCE"] = "A0"
+                    event = await asyncio.wait_for(sub.__anext__(), 2)
+                    assert (event.old, event.new) == ("30", "A0")
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_standby_polls_slowly():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            sim.state["PWR"] = "00"
+            projector = _tcp(sim)
+            try:
+                async with projector.subscribe(
+                    ["PWR"], min_interval=0.05, max_interval=1, standby_interval=60
+                ) as sub:
+                    event = await asyncio.wait_for(sub.__anext__(), 1)
+                    assert event.new == "00"
+                    await asyncio.sleep(0.3)
+                    assert sub.interval == 60
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_kick_during_poll_is_not_lost():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            polls = []
+            get_properties = projector.get_properties
+
+            async def kicking_get_properties(*args, **kwargs):
+                polls.append(time.monotonic())
+                if len(polls) == 1:
+                    sub.kick()
+                return await get_properties(*args, **kwargs)
+
+            projector.get_properties = kicking_get_properties
+            try:
+                async with projector.subscribe(["SOURCE"], min_interval=10) as sub:
+                    await asyncio.wait_for(sub.__anext__(), 1)
+                    await asyncio.sleep(0.3)
+                    assert len(polls) == 2
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_poll_timeout_keeps_polling():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+            polls = []
+            get_properties = projector.get_properties
+
+            async def flaky_get_properties(*args, **kwargs):
+                polls.append(None)
+                if len(polls) == 1:
+                    raise asyncio.TimeoutError
+                return await get_properties(*args, **kwargs)
+
+            projector.get_properties = flaky_get_properties
+            try:
+                async with projector.subscribe(["SOURCE"], min_interval=0.05) as sub:
+                    event = await asyncio.wait_for(sub.__anext__(), 1)
+                    assert event.new == "30"
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_unexpected_error_ends_iteration():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = _tcp(sim)
+
+            async def broken_get_properties(*args, **kwargs):
+                raise RuntimeError("bug")
+
+            projector.get_properties = broken_get_properties
+            try:
+                async with projector.subscribe(["SOURCE"]) as sub:
+                    with pytest.raises(RuntimeError):
+                        await asyncio.wait_for(sub.__anext__(), 1)
+                    with pytest.raises(StopAsyncIteration):
+                        await sub.__anext__()
+            finally:
+                projector.close()
+
+    asyncio.run(run())
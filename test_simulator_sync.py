@@ -0,0 +1,92 @@
+"""Tests of the synchronous facade against the projector simulator."""
+import asyncio
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from epson_projector.const import TCP
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.state import Source
+from epson_projector.sync import SyncFleet, SyncProjector, _call, _loop_thread
+
+
+@contextlib.contextmanager
+def _simulator():
+    """Run simulator in a thread of its own, like a projector in the network."""
+    started = threading.Event()
+    sims = []
+    loop = asyncio.new_event_loop()
+    stop = loop.create_future()
+
+    async def serve():
+        async with ProjectorSimulator() as sim:
+            sims.append(sim)
+            started.set()
+            await stop
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(),))
+    thread.start()
+    started.wait()
+    try:
+        yield sims[0]
+    finally:
+        loop.call_soon_threadsafe(stop.set_result, None)
+        thread.join()
+        loop.close()
+
+
+def _projector(sim):
+    return SyncProjector("127.0.0.1", type=TCP, port=sim.tcp_port)
+
+
+def test_blocking_calls():
+    with _simulator() as sim:
+        projector = _projector(sim)
+        try:
+            assert projector.get_property("PWR") == "01"
+            assert projector.send_command("HDMI2") == ""
+            assert projector.get_property("SOURCE") == "A0"
+            assert projector.get_state().source is Source.HDMI2
+            assert projector.submit("get_property", "VOLUME").result() == "10"
+            assert projector.stats()["requests"]
+            with pytest.raises(AttributeError):
+                projector.submit("close")
+        finally:
+            projector.close()
+
+
+def test_calls_from_many_threads_share_projector():
+    with _simulator() as sim:
+        projector = _projector(sim)
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                values = list(
+                    executor.map(lambda _: projector.get_property("PWR"), range(32))
+                )
+            assert values == ["01"] * 32
+        finally:
+            projector.close()
+
+
+def test_call_from_own_loop_is_refused():
+    with _simulator() as sim:
+        projector = _projector(sim)
+        try:
+            future = _loop_thread.submit(_call(projector.get_property, "PWR"))
+            with pytest.raises(RuntimeError):
+                future.result()
+        finally:
+            projector.close()
+
+
+def test_fleet_sweeps():
+    with _simulator() as sim:
+        fleet = SyncFleet([_projector(sim), _projector(sim)], ["PWR"])
+        try:
+            results = fleet.sweep()
+            assert [result.values for result in results] == [{"PWR": "01"}] * 2
+            assert len(list(fleet.iter_sweep())) == 2
+        finally:
+            fleet.close()
@@ -0,0 +1,60 @@
+"""Tests of adaptive timeouts, also learned from the projector simulator."""
+import asyncio
+
+import pytest
+
+import epson_projector as epson
+from epson_projector.const import TCP
+from epson_projector.simulator import ProjectorSimulator
+from epson_projector.stats import OUTCOME_ERROR, OUTCOME_OK, OUTCOME_TIMEOUT
+from epson_projector.timeout import (
+    MIN_TIMEOUT,
+    QUERY_CLASS,
+    AdaptiveTimeout,
+    get_timeout,
+)
+
+
+def test_static_timeout_until_first_answer():
+    adaptive = AdaptiveTimeout()
+    assert adaptive.get("PWR") == get_timeout("PWR")
+    adaptive.observe(TCP, "PWR", OUTCOME_TIMEOUT, 5)
+    assert adaptive.get("PWR") == get_timeout("PWR")
+
+
+def test_learned_timeout_is_bounded_and_backs_off():
+    adaptive = AdaptiveTimeout(min_timeout=0.01)
+    for _ in range(20):
+        adaptive.observe(TCP, "PWR", OUTCOME_OK, 0.1)
+    learned = adaptive.get("SOURCE")
+    assert 0.1 <= learned < get_timeout("SOURCE")
+    adaptive.observe(TCP, "SOURCE", OUTCOME_TIMEOUT, learned)
+    assert adaptive.get("PWR") == pytest.approx(2 * learned)
+    assert AdaptiveTimeout().get("PWR") >= MIN_TIMEOUT
+
+
+def test_batch_is_one_sample_per_reply_and_class():
+    adaptive = AdaptiveTimeout()
+    adaptive.observe_batch(
+        {"PWR": OUTCOME_OK, "SOURCE": OUTCOME_OK, "LUMINANCE": OUTCOME_ERROR}, 0.3
+    )
+    assert adaptive.estimates()[QUERY_CLASS]["srtt"] == pytest.approx(0.1)
+    adaptive.observe_batch({"PWR": OUTCOME_TIMEOUT, "SOURCE": OUTCOME_TIMEOUT}, 1)
+    assert adaptive.estimates()[QUERY_CLASS]["timeout"] == pytest.approx(0.6)
+
+
+def test_projector_learns_timeouts():
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = epson.Projector(
+                "127.0.0.1", type=TCP, port=sim.tcp_port, adaptive_timeout=True
+            )
+            try:
+                for _ in range(5):
+                    assert await projector.get_properties(["PWR", "SOURCE"])
+                learned = projector.stats()["timeouts"][QUERY_CLASS]["timeout"]
+                assert learned < get_timeout("PWR")
+            finally:
+                projector.close()
+
+    asyncio.run(run())
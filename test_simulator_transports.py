@@ -0,0 +1,101 @@
+"""Regression tests of all connection types against the projector simulator."""
+import asyncio
+import threading
+
+import epson_projector as epson
+from epson_projector.const import HTTP, SERIAL, TCP
+from epson_projector.simulator import DEFAULT_SERIAL_NUMBER, ProjectorSimulator
+
+QUERIES = ["PWR", "SOURCE", "CMODE", "VOLUME"]
+EXPECTED = {"PWR": "01", "SOURCE": "30", "CMODE": "15", "VOLUME": "10"}
+
+
+async def _projector(sim, type):
+    if type == TCP:
+        return epson.Projector(
+            "127.0.0.1",
+            type=TCP,
+            port=sim.tcp_port,
+            serial_port=sim.serial_number_port,
+        )
+    if type == HTTP:
+        return epson.Projector(
+            "127.0.0.1",
+            type=HTTP,
+            port=sim.http_port,
+            serial_port=sim.serial_number_port,
+        )
+    return epson.Projector(await sim.open_pty(), type=SERIAL)
+
+
+def _exercise(type):
+    async def run():
+        async with ProjectorSimulator() as sim:
+            projector = await _projector(sim, type)
+            try:
+                values = await projector.get_properties(QUERIES)
+                assert values == EXPECTED
+                assert await projector.send_command("HDMI2") is not False
+                assert await projector.get_property("SOURCE") == "A0"
+                assert await projector.get_serial_number() == DEFAULT_SERIAL_NUMBER
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_tcp():
+    _exercise(TCP)
+
+
+def test_http():
+    _exercise(HTTP)
+
+
+def test_serial():
+    _exercise(SERIAL)
+
+
+def test_unsupported_query_is_false():
+    async def run():
+        async with ProjectorSimulator(unsupported=["LUMINANCE"]) as sim:
+            projector = epson.Projector("127.0.0.1", type=TCP, port=sim.tcp_port)
+            try:
+                values = await projector.get_properties(["PWR", "LUMINANCE"])
+                assert values == {"PWR": "01", "LUMINANCE": False}
+            finally:
+                projector.close()
+
+    asyncio.run(run())
+
+
+def test_http_projector_moves_between_event_loops():
+    started = threading.Event()
+    ports = []
+    server_loop = asyncio.new_event_loop()
+    stop = server_loop.create_future()
+
+    async def serve():
+        async with ProjectorSimulator() as sim:
+            ports.append(sim.http_port)
+            started.set()
+            await stop
+
+    thread = threading.Thread(target=server_loop.run_until_complete, args=(serve(),))
+    thread.start()
+    started.wait()
+    first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        projector = epson.Projector("127.0.0.1", type=HTTP, port=ports[0])
+        assert first.run_until_complete(projector.get_property("PWR")) == "01"
+        # Session of idle first loop is released from inside second one.
+        assert second.run_until_complete(projector.get_property("SOURCE")) == "30"
+        projector.close()
+        second.run_until_complete(asyncio.sleep(0.05))
+        first.run_until_complete(asyncio.sleep(0.05))
+    finally:
+        first.close()
+        second.close()
+        server_loop.call_soon_threadsafe(stop.set_result, None)
+        thread.join()
+        server_loop.close()